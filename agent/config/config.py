@@ -0,0 +1,115 @@
+from enum import StrEnum
+from pathlib import Path
+
+from pydantic import Field, SecretStr
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+class LogLevel(StrEnum):
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+    CRITICAL = "CRITICAL"
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=PROJECT_ROOT / ".env", env_file_encoding="utf-8", extra="allow")
+    postgres_host: str = Field(..., alias="POSTGRES_HOST", description="PostgreSQL host")
+    postgres_port: int = Field(..., alias="POSTGRES_PORT", description="PostgreSQL port")
+    postgres_db: str = Field(..., alias="POSTGRES_DB", description="PostgreSQL database name")
+    postgres_user: str = Field(..., alias="POSTGRES_USER", description="PostgreSQL username")
+    postgres_password: SecretStr = Field(..., alias="POSTGRES_PASSWORD", description="PostgreSQL password")
+    log_level: LogLevel = Field(
+        default="INFO", alias="AGENT_LOG_LEVEL", description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)"
+    )
+    db_pool_max_size: int = Field(
+        default=10, alias="AGENT_DB_POOL_MAX_SIZE", description="Max number of open connections in the pool"
+    )
+    db_primary_pool_max_size: int = Field(
+        default=2,
+        alias="AGENT_DB_PRIMARY_POOL_MAX_SIZE",
+        description="Max connections to the primary for data version and schema reads when a replica is configured",
+    )
+    db_pool_checkout_timeout: float = Field(
+        default=10.0, alias="AGENT_DB_POOL_CHECKOUT_TIMEOUT", description="Seconds to wait for a free connection"
+    )
+    db_pool_max_lifetime: float = Field(
+        default=1800.0, alias="AGENT_DB_POOL_MAX_LIFETIME", description="Seconds after which a connection is recycled"
+    )
+    db_pool_max_idle: float = Field(
+        default=300.0, alias="AGENT_DB_POOL_MAX_IDLE", description="Seconds an idle connection is kept open"
+    )
+    db_pool_health_check_interval: float = Field(
+        default=30.0,
+        alias="AGENT_DB_POOL_HEALTH_CHECK_INTERVAL",
+        description="Idle seconds after which a connection is pinged before checkout",
+    )
+    schema_cache_ttl: float = Field(
+        default=300.0, alias="AGENT_SCHEMA_CACHE_TTL", description="Seconds the rendered DB schema is cached"
+    )
+    max_concurrency_per_agent: int = Field(
+        default=4, alias="AGENT_MAX_CONCURRENCY", description="Max concurrent requests served by each agent backend"
+    )
+    answer_cache_max_entries: int = Field(
+        default=512, alias="AGENT_ANSWER_CACHE_MAX_ENTRIES", description="Max number of cached agent answers"
+    )
+    answer_cache_ttl: float = Field(
+        default=3600.0, alias="AGENT_ANSWER_CACHE_TTL", description="Seconds a cached agent answer stays valid"
+    )
+    data_version_max_age: float = Field(
+        default=2.0, alias="AGENT_DATA_VERSION_MAX_AGE", description="Seconds a read resumes data version is reused"
+    )
+    sql_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        alias="AGENT_SQL_CACHE_MAX_BYTES",
+        description="Memory cap of the SQL result cache, measured by serialized result size",
+    )
+    sql_cache_ttl: float = Field(
+        default=3600.0, alias="AGENT_SQL_CACHE_TTL", description="Seconds a cached SQL result stays valid"
+    )
+    sql_row_limit: int = Field(default=1000, alias="AGENT_SQL_ROW_LIMIT", description="Max rows returned to the LLM")
+    sql_byte_limit: int = Field(
+        default=200_000, alias="AGENT_SQL_BYTE_LIMIT", description="Max JSON-serialized bytes returned to the LLM"
+    )
+    sql_fetch_batch_size: int = Field(
+        default=200, alias="AGENT_SQL_FETCH_BATCH_SIZE", description="Rows fetched per server-side cursor round trip"
+    )
+    result_encoding: str = Field(
+        default="columnar",
+        alias="AGENT_RESULT_ENCODING",
+        description="How SQL results are serialized for the LLM (json, columnar, markdown, sample)",
+    )
+    result_token_budget: int = Field(
+        default=4000, alias="AGENT_RESULT_TOKEN_BUDGET", description="Max estimated tokens of an encoded SQL result"
+    )
+    result_max_cell_chars: int = Field(
+        default=300, alias="AGENT_RESULT_MAX_CELL_CHARS", description="Cells longer than this are clipped"
+    )
+    result_sample_rows: int = Field(
+        default=20, alias="AGENT_RESULT_SAMPLE_ROWS", description="Rows kept verbatim by the sample encoding"
+    )
+    sql_max_cost: float = Field(
+        default=1_000_000.0, alias="AGENT_SQL_MAX_COST", description="Max planner cost of an agent SELECT"
+    )
+    sql_max_plan_rows: int = Field(
+        default=100_000, alias="AGENT_SQL_MAX_PLAN_ROWS", description="Max planner row estimate of an agent SELECT"
+    )
+    sql_statement_timeout_ms: int = Field(
+        default=10_000, alias="AGENT_SQL_STATEMENT_TIMEOUT_MS", description="statement_timeout for agent SQL"
+    )
+    sql_lock_timeout_ms: int = Field(
+        default=1_000, alias="AGENT_SQL_LOCK_TIMEOUT_MS", description="lock_timeout for agent SQL"
+    )
+    sql_work_mem: str = Field(default="16MB", alias="AGENT_SQL_WORK_MEM", description="work_mem for agent SQL")
+    sql_replica_dsn: SecretStr | None = Field(
+        default=None,
+        alias="AGENT_SQL_REPLICA_DSN",
+        description="libpq DSN of a read replica for agent queries; the primary is used when unset",
+    )
+
+
+settings = Settings()
@@ -1,14 +1,40 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import psycopg2
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 
+from agent.config.config import settings
+from agent.src.answer_cache import answer_cache
+from agent.src.data_version import get_data_version
+from agent.src.db_pool import db_executor, pool, primary_pool, run_in_db_executor
 from agent.src.logger import setup_logging
-from agent.src.models import AgentQueryRequest
-from agent.src.pydantic_ai_agent import pydantic_ai_agent
+from agent.src.models import AgentEnum, AgentQueryRequest
+from agent.src.pydantic_ai_agent import run_pydantic_ai
+from agent.src.schema_catalog import schema_catalog
 from agent.src.self_written_agent import process_user_message
-from agent.src.smolagent_agent import smolagent_agent
+from agent.src.smolagent_agent import run_smolagent
+from agent.src.sql_cache import sql_result_cache
+from agent.src.streaming import encode_event, stream_agent
 
 
 logger = setup_logging()
-app = FastAPI()
+
+agent_limiters = {agent: asyncio.Semaphore(settings.max_concurrency_per_agent) for agent in AgentEnum}
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    db_executor.shutdown(wait=False, cancel_futures=True)
+    pool.close()
+    primary_pool.close()
+    logger.info("Database connection pools closed.")
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/", tags=["Root"])
@@ -16,22 +42,89 @@ async def root() -> dict:
     return {"message": "Welcome to the Agent API!"}
 
 
+async def current_data_version() -> str | None:
+    try:
+        return await run_in_db_executor(get_data_version)
+    except (psycopg2.Error, TimeoutError):
+        logger.warning("Could not read resumes data version, answer cache bypassed", exc_info=True)
+        return None
+
+
 @app.post("/agent_query")
 async def agent_query(request: AgentQueryRequest) -> None:
+    data_version = await current_data_version()
+    if data_version and (cached := answer_cache.get(request.agent.value, request.query, data_version)) is not None:
+        return {"response": cached}
+
     try:
-        if request.agent == "smollagents":
-            result = smolagent_agent.run(request.query)
-        elif request.agent == "pydantic_ai_agent":
-            result = await pydantic_ai_agent.run(request.query)
-            result = result.output
-        elif request.agent == "self_written_agent":
-            result = process_user_message(request.query)
+        async with agent_limiters[request.agent]:
+            if request.agent == "smollagents":
+                reply = await asyncio.to_thread(run_smolagent, request.query)
+            elif request.agent == "pydantic_ai_agent":
+                reply = await run_pydantic_ai(request.query)
+            elif request.agent == "self_written_agent":
+                reply = await process_user_message(request.query)
 
     except TimeoutError as err:
         raise HTTPException(status_code=504, detail="The request to the agent timed out.") from err
-    return {"response": result}
+
+    # Answers built on a failed SQL step describe the failure, not the data, and must not outlive it.
+    if data_version and reply.cacheable:
+        answer_cache.set(request.agent.value, request.query, data_version, reply.answer)
+    return {"response": reply.answer}
+
+
+@app.post("/agent_query/stream")
+async def agent_query_stream(request: AgentQueryRequest) -> StreamingResponse:
+    """Stream agent progress as NDJSON events: ``sql``, ``rows`` or ``sql_error``, ``token``/``answer`` and ``done``."""
+
+    async def events() -> AsyncIterator[bytes]:
+        data_version = await current_data_version()
+        if data_version and (cached := answer_cache.get(request.agent.value, request.query, data_version)) is not None:
+            yield encode_event({"event": "answer", "data": cached})
+            yield encode_event({"event": "done", "data": cached})
+            return
+
+        answer_parts = []
+        sql_failed = False
+        try:
+            async with agent_limiters[request.agent]:
+                async for event in stream_agent(request.agent, request.query):
+                    if event["event"] in {"token", "answer"}:
+                        answer_parts.append(event["data"])
+                    sql_failed = sql_failed or event["event"] == "sql_error"
+                    yield encode_event(event)
+        except TimeoutError:
+            yield encode_event({"event": "error", "data": "The request to the agent timed out."})
+        except Exception as e:
+            logger.exception("Agent stream failed")
+            yield encode_event({"event": "error", "data": str(e)})
+        else:
+            answer = "".join(answer_parts)
+            if data_version and not sql_failed:
+                answer_cache.set(request.agent.value, request.query, data_version, answer)
+            yield encode_event({"event": "done", "data": answer})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
 
 
 @app.get("/healthcheck", tags=["Health"])
 async def healthcheck() -> dict:
     return {"status": "healthy"}
+
+
+@app.get("/stats", tags=["Health"])
+async def stats() -> dict:
+    return {
+        "db_pool": pool.stats(),
+        "db_primary_pool": primary_pool.stats(),
+        "schema_catalog": schema_catalog.stats(),
+        "answer_cache": answer_cache.stats(),
+        "sql_cache": sql_result_cache.stats(),
+    }
+
+
+@app.post("/admin/schema_cache/invalidate", tags=["Admin"])
+async def invalidate_schema_cache() -> dict:
+    schema_catalog.invalidate()
+    return {"status": "invalidated"}
@@ -0,0 +1,83 @@
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any
+
+from agent.config.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different phrasings share a cache key."""
+    text = unicodedata.normalize("NFKC", query).casefold().replace("ё", "е")
+    text = re.sub(r"[^\w\s+#]", " ", text)
+    return " ".join(text.split())
+
+
+class AnswerCache:
+    """LRU cache of final agent answers keyed on agent, normalized query and data version.
+
+    A new data version makes every older entry unreachable, so inserts into ``resumes`` invalidate answers
+    without explicit purging; stale entries age out through the LRU and the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, Any]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+    @staticmethod
+    def _key(agent: str, query: str, data_version: str) -> tuple[str, str, str]:
+        return agent, normalize_query(query), data_version
+
+    def get(self, agent: str, query: str, data_version: str) -> Any | None:  # noqa: ANN401
+        key = self._key(agent, query, data_version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        stored_at, answer = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._expired += 1
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        logger.info(f"Answer cache hit for {agent}: {key[1]}")
+        return answer
+
+    def set(self, agent: str, query: str, data_version: str, answer: Any) -> None:  # noqa: ANN401
+        key = self._key(agent, query, data_version)
+        self._entries[key] = (time.monotonic(), answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "expired": self._expired,
+        }
+
+
+answer_cache = AnswerCache(max_entries=settings.answer_cache_max_entries, ttl=settings.answer_cache_ttl)
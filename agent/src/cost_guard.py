@@ -0,0 +1,68 @@
+import json
+import logging
+from dataclasses import dataclass
+
+import psycopg2
+import sqlparse
+
+from agent.config.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRejectedError(ValueError):
+    """Raised when the planner estimates a query to be too expensive to run."""
+
+
+@dataclass
+class PlanEstimate:
+    total_cost: float
+    plan_rows: int
+
+    def exceeds_limits(self) -> bool:
+        return self.total_cost > settings.sql_max_cost or self.plan_rows > settings.sql_max_plan_rows
+
+
+def explain(cursor: psycopg2.extensions.cursor, query: str) -> PlanEstimate:
+    """Return the planner's estimated total cost and row count for ``query`` without executing it."""
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    return PlanEstimate(total_cost=float(root["Total Cost"]), plan_rows=int(root["Plan Rows"]))
+
+
+def _unterminated(query: str) -> str:
+    """Strip comments, surrounding whitespace and the trailing ``;`` so ``query`` can be nested as a subquery.
+
+    Comments must go first: a trailing ``-- comment`` would otherwise swallow the closing parenthesis.
+    """
+    return sqlparse.format(query, strip_comments=True).strip().rstrip(";").strip()
+
+
+def guard_query(cursor: psycopg2.extensions.cursor, query: str) -> tuple[str, bool]:
+    """Check a SELECT against the cost thresholds; return the query to run and whether it was rewritten.
+
+    Queries over ``AGENT_SQL_MAX_COST`` or ``AGENT_SQL_MAX_PLAN_ROWS`` are first wrapped in a ``LIMIT`` just
+    above the row cap, which lets the planner pick a fast-start plan; if even that is too expensive the query
+    is rejected.
+    """
+    estimate = explain(cursor, query)
+    logger.debug(f"Plan estimate: cost={estimate.total_cost}, rows={estimate.plan_rows}")
+    if not estimate.exceeds_limits():
+        return query, False
+
+    limited = f"SELECT * FROM ({_unterminated(query)}) AS limited_result LIMIT {settings.sql_row_limit + 1}"  # noqa: S608
+    limited_estimate = explain(cursor, limited)
+    if not limited_estimate.exceeds_limits():
+        logger.info(f"Query rewritten with LIMIT: cost {estimate.total_cost} -> {limited_estimate.total_cost}")
+        return limited, True
+
+    logger.warning(f"Query rejected by cost guard: cost={estimate.total_cost}, rows={estimate.plan_rows}")
+    raise QueryRejectedError(
+        f"Query is too expensive (estimated cost {estimate.total_cost:.0f}, rows {estimate.plan_rows}; "
+        f"limits {settings.sql_max_cost:.0f} / {settings.sql_max_plan_rows}). "
+        "Add selective filters or aggregate the data instead."
+    )
@@ -0,0 +1,74 @@
+import logging
+import threading
+import time
+
+import psycopg2
+
+from agent.config.config import settings
+from agent.src.db_pool import primary_pool
+
+
+logger = logging.getLogger(__name__)
+
+_versions: dict[str, tuple[float, str | None]] = {}
+_versions_lock = threading.Lock()
+
+
+def get_data_version(table_name: str = "resumes") -> str | None:
+    """Return an opaque token that changes whenever rows of ``table_name`` change, or ``None`` while it is unsettled.
+
+    Callers must not cache anything under a ``None`` version.
+
+    The token is memoized for ``AGENT_DATA_VERSION_MAX_AGE`` seconds, so bursts of cache lookups share one
+    round trip at the cost of that much staleness.
+    """
+    now = time.monotonic()
+    with _versions_lock:
+        memo = _versions.get(table_name)
+    if memo is not None and now - memo[0] < settings.data_version_max_age:
+        return memo[1]
+
+    version = _read_data_version(table_name)
+    with _versions_lock:
+        _versions[table_name] = (now, version)
+    return version
+
+
+def _read_data_version(table_name: str) -> str | None:
+    """Read the trigger-bumped ``<table>_data_version_seq`` on the primary.
+
+    The sequence moves inside the writing transaction, before its rows are visible to anyone else. While another
+    session holds a write lock on the table the version is therefore not settled yet, and ``None`` is returned so
+    that no answer computed from the old rows is cached under the new version. Databases created before the
+    sequence existed fall back to a row-count/max-id watermark.
+    """
+    with primary_pool.connection() as conn, conn.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"""
+                SELECT
+                    CASE WHEN is_called THEN last_value ELSE 0 END,
+                    EXISTS (
+                        SELECT 1
+                        FROM pg_locks
+                        WHERE relation = %s::regclass
+                          AND mode IN ('RowExclusiveLock', 'AccessExclusiveLock')
+                          AND granted
+                          AND pid <> pg_backend_pid()
+                    )
+                FROM {table_name}_data_version_seq
+                """,  # noqa: S608
+                (table_name,),
+            )
+        except psycopg2.errors.UndefinedTable:
+            conn.rollback()
+            logger.debug("Data version sequence is missing, using row watermark")
+        else:
+            version, writing = cursor.fetchone()
+            if writing:
+                logger.debug(f"Write to {table_name} in progress, data version not settled")
+                return None
+            return f"v{version}"
+        cursor.execute(f"SELECT count(*), coalesce(max(id), 0) FROM {table_name}")  # noqa: S608
+        count, max_id = cursor.fetchone()
+        return f"w{count}:{max_id}"
@@ -0,0 +1,281 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, connection
+
+from agent.config.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+db_params = {
+    "host": settings.postgres_host,
+    "port": settings.postgres_port,
+    "database": settings.postgres_db,
+    "user": settings.postgres_user,
+    "password": settings.postgres_password.get_secret_value(),
+}
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no connection could be checked out within the timeout."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a connection is requested from a closed pool."""
+
+
+@dataclass
+class _PooledConnection:
+    conn: connection
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """Size-bounded, thread-safe pool of psycopg2 connections.
+
+    Connections are opened lazily up to ``max_size``, pinged before checkout when they have been idle longer
+    than ``health_check_interval``, recycled after ``max_lifetime`` and closed after ``max_idle`` seconds unused.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        params: dict,
+        *,
+        max_size: int,
+        checkout_timeout: float,
+        max_lifetime: float,
+        max_idle: float,
+        health_check_interval: float,
+        configure: Callable[[connection], None] | None = None,
+    ) -> None:
+        self.params = params
+        self.configure = configure
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+
+        self._cond = threading.Condition()
+        self._idle: list[_PooledConnection] = []
+        self._in_use: dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self) -> _PooledConnection:
+        conn = psycopg2.connect(**self.params)
+        if self.configure is not None:
+            self.configure(conn)
+        return _PooledConnection(conn)
+
+    def _is_healthy(self, entry: _PooledConnection, now: float) -> bool:
+        if entry.conn.closed:
+            return False
+        if now - entry.last_used_at < self.health_check_interval:
+            return True
+        try:
+            with entry.conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            entry.conn.rollback()
+        except psycopg2.Error:
+            logger.warning("Pooled connection failed health check, reconnecting")
+            return False
+        return True
+
+    def _close_quietly(self, entry: _PooledConnection) -> None:
+        try:
+            entry.conn.close()
+        except psycopg2.Error:
+            logger.debug("Error while closing pooled connection", exc_info=True)
+
+    def _prune_idle(self, now: float) -> list[_PooledConnection]:
+        """Detach idle connections past ``max_idle``; must be called with the lock held."""
+        expired = [entry for entry in self._idle if now - entry.last_used_at > self.max_idle]
+        if expired:
+            self._idle = [entry for entry in self._idle if entry not in expired]
+            self._size -= len(expired)
+        return expired
+
+    def getconn(self, timeout: float | None = None) -> connection:
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        entry = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(f"No database connection available within {timeout:.1f}s")
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+        try:
+            entry = self._validate(entry)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._in_use[id(entry.conn)] = entry
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return entry.conn
+
+    def _validate(self, entry: _PooledConnection | None) -> _PooledConnection:
+        if entry is None:
+            return self._connect()
+
+        now = time.monotonic()
+        if now - entry.created_at > self.max_lifetime:
+            self._close_quietly(entry)
+            with self._cond:
+                self._recycled += 1
+            return self._connect()
+        if not self._is_healthy(entry, now):
+            self._close_quietly(entry)
+            with self._cond:
+                self._discarded += 1
+            return self._connect()
+        return entry
+
+    def putconn(self, conn: connection, *, discard: bool = False) -> None:
+        with self._cond:
+            entry = self._in_use.pop(id(conn), None)
+        if entry is None:
+            logger.warning("Attempt to return a connection that does not belong to the pool")
+            return
+
+        if not discard and not conn.closed and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        now = time.monotonic()
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._discarded += 1
+                expired = [entry]
+            else:
+                entry.last_used_at = now
+                self._idle.append(entry)
+                expired = self._prune_idle(now)
+            self._cond.notify()
+
+        for stale in expired:
+            self._close_quietly(stale)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[connection]:
+        """Check out a connection for the duration of the block.
+
+        Any open transaction is rolled back on return; connections broken by the block are discarded. Statement and
+        lock timeouts are OperationalErrors too, but they leave the connection usable, so it is kept.
+        """
+        conn = self.getconn(timeout)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.extensions.QueryCanceledError, psycopg2.errors.LockNotAvailable):
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "target": "replica" if "dsn" in self.params else "primary",
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "discarded": self._discarded,
+                "avg_wait_ms": round(self._total_wait / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+
+def _read_only_session(conn: connection) -> None:
+    conn.set_session(readonly=True)
+
+
+def _create_pool(params: dict, max_size: int) -> ConnectionPool:
+    return ConnectionPool(
+        params,
+        configure=_read_only_session,
+        max_size=max_size,
+        checkout_timeout=settings.db_pool_checkout_timeout,
+        max_lifetime=settings.db_pool_max_lifetime,
+        max_idle=settings.db_pool_max_idle,
+        health_check_interval=settings.db_pool_health_check_interval,
+    )
+
+
+# The agent only reads: every transaction is READ ONLY. LLM-generated SQL goes to ``pool``, which a replica DSN
+# moves off the primary; ``primary_pool`` serves reads that must see the latest commits (data version, schema
+# catalog) and is the same pool when no replica is configured.
+if settings.sql_replica_dsn:
+    primary_pool = _create_pool(db_params, settings.db_primary_pool_max_size)
+    pool = _create_pool({"dsn": settings.sql_replica_dsn.get_secret_value()}, settings.db_pool_max_size)
+else:
+    primary_pool = pool = _create_pool(db_params, settings.db_pool_max_size)
+
+# Blocking psycopg2 work is run here so it never stalls the event loop; sized to the pool so every worker
+# thread can hold a connection without queueing on checkout.
+db_executor = ThreadPoolExecutor(max_workers=settings.db_pool_max_size, thread_name_prefix="agent-db")
+
+
+async def run_in_db_executor[T](func: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+    return await asyncio.get_running_loop().run_in_executor(db_executor, func, *args)
@@ -1,9 +1,10 @@
-from enum import Enum
+from enum import StrEnum
+from typing import NamedTuple
 
 from pydantic import BaseModel
 
 
-class AgentEnum(str, Enum):
+class AgentEnum(StrEnum):
     self_written_agent = "self_written_agent"
     smollagents = "smollagents"
     pydantic_ai_agent = "pydantic_ai_agent"
@@ -12,3 +13,10 @@ class AgentEnum(str, Enum):
 class AgentQueryRequest(BaseModel):
     agent: AgentEnum
     query: str
+
+
+class AgentReply(NamedTuple):
+    """An agent's answer; ``cacheable`` is false when a SQL step failed and the answer may describe the failure."""
+
+    answer: str
+    cacheable: bool
@@ -3,17 +3,15 @@ import os
 import psycopg2
 from openai import AsyncOpenAI
 from pydantic_ai import Agent, Tool
+from pydantic_ai.messages import ToolReturnPart
 from pydantic_ai.models.openai import OpenAIModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
-
-db_params = {
-    "host": os.getenv("POSTGRES_HOST"),
-    "port": os.getenv("POSTGRES_PORT"),
-    "database": os.getenv("POSTGRES_DB"),
-    "user": os.getenv("POSTGRES_USER"),
-    "password": os.getenv("POSTGRES_PASSWORD"),
-}
+from agent.src.cost_guard import QueryRejectedError
+from agent.src.models import AgentReply
+from agent.src.result_encoder import encode_error, encode_result, is_sql_error
+from agent.src.sql_cache import sql_result_cache
+from agent.src.sql_executor import execute_bounded
 
 
 def sql_engine(query: str) -> str:
@@ -35,6 +33,25 @@ def sql_engine(query: str) -> str:
     - gender (text)             - «женский», «мужской»,
     - title (text)              - current/target job titles(nullable)
     - summary (text)            - short profile with description  of position
+    - companies (ARRAY)         - generated: distinct employer names from experience
+    - summary_tsv (tsvector)    - generated: full-text index over summary
+
+    Table Schema for "resume_experience" (one row per job, kept in sync with resumes.experience):
+    - resume_id (integer)       - resumes.id
+    - company (text)            - employer, B-tree indexed
+    - job_title (text)          - position title
+    - start_date, end_date (date) - parsed dates; end_date is NULL for the current job
+    - is_current (boolean)      - the position has no end date
+    - duration_months (integer) - months in the position, B-tree indexed
+
+    View "resume_experience_totals" (one row per resume with experience):
+    - resume_id (integer)       - resumes.id
+    - experience_years (numeric) - total years in all positions, current ones counted up to today
+
+    Table Schema for "resume_education" (one row per education entry):
+    - resume_id (integer)       - resumes.id
+    - institution, degree, details (text)
+    - start_date, end_date (date), duration_months (integer)
     First 5 rows from `resumes`:
     id | name | gender | title | summary | contact_info | skills | experience | education | languages | certifications | hobbies | portfolio
     1 | Зыкова Валерия Кузьминична | женский | Mobile Developer | Опытный мобильный разработчик с 5-летним стажем в разработке и оптимизации мобильных приложений. Обладаю глубоким пониманием современных технологий и платформ, таких как iOS и Android. Сильные навыки в проектировании, разработке и тестировании приложений, а также в работе в команде и управлении проектами. Ищу возможность применить свои навыки и знания в динамичной и инновационной компании. | {'email': 'valeriya.zykova@example.com', 'phone': '+7 (808) 262-35-84', 'github': 'github.com/valeriya-zykova', 'linkedin': 'linkedin.com/in/valeriya-zykova', 'location': 'Чехия'} | ['Swift', 'Kotlin', 'React Native', 'Firebase', 'Git', 'Agile/Scrum', 'UX/UI Design', 'RESTful APIs', 'CI/CD', 'Test-Driven Development'] | [{'company': 'TechSolutions', 'end_date': '2023-05-31', 'job_title': 'Mobile Developer', 'start_date': '2018-06-01', 'achievements': ['Разработала и запустила 3 мобильных приложения для iOS и Android, которые достигли более 100 000 загрузок.', 'Оптимизировала производительность приложений, сократив время загрузки на 30%.', 'Внедрила CI/CD пайплайны, что сократило время развертывания на 50%.', 'РаЬотала в мультидисциплинарной команде, координируя усилия разработчиков, дизайнеров и тестировщиков.']}] | [{'degree': 'Бакалавр информационных технологий', 'details': 'Специализация: Программная инженерия', 'end_date': '2017-06-30', 'start_date': '2013-09-01', 'institution': 'Санкт-Петербургский Политехнический Университет'}] | ['Русский – родной', 'Английский – B2', 'Чешский – A2'] | ['Google Certified Professional Cloud Developer', 'Apple Developer Program'] | ['Фотография', 'Путешествия', 'Программирование в свободное время'] | [{'link': 'github.com/valeriya-zykova/TravelApp', 'name': 'TravelApp', 'description': 'Мобильное приложение для планирования путешествий. Использовались технологии: Swift, Firebase, MapKit. Приложение позволяет пользователям создавать маршруты, добавлять точки интереса и делиться планами с друзьями.'}, {'link': 'github.com/valeriya-zykova/FitnessTracker', 'name': 'FitnessTracker', 'description': 'Приложение для отслеживания физической активности. Использовались технологии: Kotlin, Google Fit API, Room Database. Приложение позволяет пользователям отслеживать свои тренировки, устанавливать цели и получать уведомления о прогрессе.'}]
@@ -47,7 +64,7 @@ def sql_engine(query: str) -> str:
         >>> sql_engine(\'''
             SELECT id, name, title
             FROM resumes
-            WHERE 'Kubernetes' = ANY(skills)
+            WHERE skills @> ARRAY['Kubernetes']
             ORDER BY id
             LIMIT 5;
         \''')
@@ -58,10 +75,16 @@ def sql_engine(query: str) -> str:
             SET title = 'Mobile Developer'
             WHERE id = 1;
         \''')
-        "Query executed successfully, but no results to fetch."
+        "Error: Only a single SELECT statement is allowed."
 
     Important:
         • Use provided schema and select only available columns
+        • Prefer indexed predicates: skills/languages/certifications/companies @> ARRAY[...] (not = ANY),
+          title ILIKE '%...%', summary_tsv @@ plainto_tsquery('russian', '...').
+        • For total experience ("опыт более N лет") join resume_experience_totals t ON t.resume_id = resumes.id
+          and filter t.experience_years >= N.
+        • For tenure/employer questions join resume_experience instead of parsing experience JSON, e.g.
+          WHERE e.company = 'X' AND e.duration_months >= 36.
         • Never pass raw user input directly into *query*; always parameterize
           to avoid SQL injection.
         • Avoid requesting more than 1 000 rows per call to keep responses
@@ -72,7 +95,7 @@ def sql_engine(query: str) -> str:
         >>> sql_engine(\"""
             SELECT id, name, title
             FROM resumes
-            WHERE 'Kubernetes' = ANY(skills)
+            WHERE skills @> ARRAY['Kubernetes']
             ORDER BY id
             LIMIT 5;
         \""")
@@ -85,19 +108,12 @@ def sql_engine(query: str) -> str:
           manageable for the language model.
 
     """  # noqa: E501
-    output = ""
-    conn = psycopg2.connect(**db_params)
-    cursor = conn.cursor()
-    cursor.execute(query)
-
     try:
-        output = cursor.fetchall()
-    except psycopg2.ProgrammingError:
-        output = "Query executed successfully, but no results to fetch."
-
-    conn.commit()
-    conn.close()
-    return output
+        return encode_result(sql_result_cache.fetch(query, "rows", lambda: execute_bounded(query)))
+    except QueryRejectedError as e:
+        return encode_error(str(e))
+    except (psycopg2.Error, TimeoutError) as e:
+        return encode_error(f"database error: {e!s}")
 
 
 openai_provider = OpenAIProvider(
@@ -126,3 +142,14 @@ pydantic_ai_agent = Agent(
     """,
     tools=[sql_tool],
 )
+
+
+async def run_pydantic_ai(query: str) -> AgentReply:
+    """Run the agent on ``query``; the answer is cacheable only if no ``sql_engine`` call reported an error."""
+    result = await pydantic_ai_agent.run(query)
+    failed = any(
+        isinstance(part, ToolReturnPart) and is_sql_error(part.content)
+        for message in result.all_messages()
+        for part in message.parts
+    )
+    return AgentReply(str(result.output), cacheable=not failed)
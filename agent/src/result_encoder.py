@@ -0,0 +1,158 @@
+import json
+import logging
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+from enum import StrEnum
+
+from agent.config.config import settings
+from agent.src.sql_executor import NO_RESULTS_MESSAGE, QueryResult
+
+
+logger = logging.getLogger(__name__)
+
+HEADER_PATTERN = re.compile(r"^rows: (\d+)")
+# Every SQL tool output that reports a failure instead of rows starts with this; answers built on one are not cached.
+SQL_ERROR_PREFIX = "Error: "
+
+
+class ResultEncoding(StrEnum):
+    json = "json"
+    columnar = "columnar"
+    markdown = "markdown"
+    sample = "sample"
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the BPE token count: ~4 characters per token for ASCII, ~2 for Cyrillic and other scripts."""
+    non_ascii = sum(1 for char in text if ord(char) > 127)  # noqa: PLR2004
+    return math.ceil((len(text) - non_ascii) / 4 + non_ascii / 2)
+
+
+def _compact(value: object, max_chars: int) -> object:
+    """Render nested JSONB/array values as compact JSON and clip long cells."""
+    if value is None or isinstance(value, bool | int | float):
+        return value
+    text = (
+        value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str, separators=(",", ":"))
+    )
+    return text if len(text) <= max_chars else text[: max_chars - 1] + "…"
+
+
+def _table(result: QueryResult, max_chars: int) -> tuple[list[str], list[list]]:
+    rows = result.rows
+    columns = result.columns or (list(rows[0].keys()) if rows and isinstance(rows[0], dict) else [])
+    if not columns and rows:
+        columns = [f"col{i}" for i in range(len(rows[0]))]
+    values = [list(row.values()) if isinstance(row, dict) else list(row) for row in rows]
+    return columns, [[_compact(cell, max_chars) for cell in row] for row in values]
+
+
+def _header(result: QueryResult, shown: int) -> str:
+    header = f"rows: {shown}"
+    if result.truncated:
+        header += f" (truncated, more than {len(result.rows)} rows)"
+    elif shown < len(result.rows):
+        header += f" (truncated, total {len(result.rows)})"
+    return header
+
+
+def _encode_json(columns: list[str], rows: list[list]) -> str:
+    return json.dumps([dict(zip(columns, row, strict=False)) for row in rows], ensure_ascii=False, default=str)
+
+
+def _encode_columnar(columns: list[str], rows: list[list]) -> str:
+    return json.dumps({"columns": columns, "rows": rows}, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+def _encode_markdown(columns: list[str], rows: list[list]) -> str:
+    def cell(value: object) -> str:
+        return "" if value is None else str(value).replace("|", "\\|").replace("\n", " ")
+
+    lines = ["| " + " | ".join(columns) + " |", "|" + "---|" * len(columns)]
+    lines.extend("| " + " | ".join(cell(value) for value in row) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def _aggregates(columns: list[str], rows: list[list]) -> dict:
+    """Summarize each column: min/max/avg for numbers, most common values for everything else."""
+    summary = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows if row[index] is not None]
+        numbers = [value for value in values if isinstance(value, int | float) and not isinstance(value, bool)]
+        if numbers and len(numbers) == len(values):
+            summary[column] = {"min": min(numbers), "max": max(numbers), "avg": round(sum(numbers) / len(numbers), 2)}
+        else:
+            top = Counter(str(value) for value in values).most_common(5)
+            summary[column] = {"distinct": len({str(value) for value in values}), "top": top}
+    return summary
+
+
+def _encode_sample(columns: list[str], rows: list[list]) -> str:
+    sample = rows[: settings.result_sample_rows]
+    payload = {"columns": columns, "sample": sample, "aggregates": _aggregates(columns, rows)}
+    return json.dumps(payload, ensure_ascii=False, default=str, separators=(",", ":"))
+
+
+ENCODERS: dict[ResultEncoding, Callable[[list[str], list[list]], str]] = {
+    ResultEncoding.json: _encode_json,
+    ResultEncoding.columnar: _encode_columnar,
+    ResultEncoding.markdown: _encode_markdown,
+    ResultEncoding.sample: _encode_sample,
+}
+
+
+def encode_result(
+    result: QueryResult,
+    encoding: ResultEncoding | None = None,
+    token_budget: int | None = None,
+) -> str:
+    """Serialize a query result for an LLM prompt within ``token_budget`` tokens.
+
+    Every encoding starts with a ``rows: N`` header line (with truncation info when rows were dropped). If the
+    encoded rows do not fit the budget, the number of rows is bisected down to the largest prefix that does.
+    Failed queries are rendered as their error message instead (see :func:`encode_error`).
+    """
+    if result.error is not None:
+        return encode_error(result.error)
+    if not result.returns_rows:
+        return NO_RESULTS_MESSAGE
+
+    encoding = ResultEncoding(encoding or settings.result_encoding)
+    token_budget = token_budget or settings.result_token_budget
+    encoder = ENCODERS[encoding]
+    columns, rows = _table(result, settings.result_max_cell_chars)
+
+    def render(count: int) -> str:
+        return f"{_header(result, count)}\n{encoder(columns, rows[:count])}"
+
+    text = render(len(rows))
+    if estimate_tokens(text) <= token_budget or not rows:
+        return text
+
+    low, high = 0, len(rows)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(render(middle)) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    logger.info(f"Encoded result shrunk from {len(rows)} to {low} rows to fit {token_budget} tokens")
+    return render(low)
+
+
+def encode_error(message: str) -> str:
+    return f"{SQL_ERROR_PREFIX}{message}"
+
+
+def is_sql_error(output: object) -> bool:
+    """Whether a SQL tool output reports a failure (see :func:`encode_error`)."""
+    return isinstance(output, str) and output.startswith(SQL_ERROR_PREFIX)
+
+
+def count_encoded_rows(text: object) -> tuple[int, bool] | None:
+    """Parse the ``rows: N`` header of an encoded result; returns the row count and whether it was truncated."""
+    if not isinstance(text, str) or not (match := HEADER_PATTERN.match(text)):
+        return None
+    return int(match.group(1)), "(truncated" in text.split("\n", 1)[0]
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+from agent.config.config import settings
+from agent.src.db_pool import primary_pool
+
+
+logger = logging.getLogger(__name__)
+
+# Service tables that are not useful to the LLM and should stay out of the prompt.
+INTERNAL_TABLES = ["schema_migrations", "data_load_checkpoints"]
+
+
+class SchemaCatalog:
+    """TTL cache of the rendered database schema used in agent prompts.
+
+    Table and column comments (indexing hints and descriptions of generated columns set by migrations) are appended to
+    each column line so the LLM picks index-friendly predicates.
+
+    The whole catalog is loaded with a single ``information_schema`` query, so a refresh costs one round trip
+    and steady-state prompt construction does no database I/O at all.
+    """
+
+    def __init__(self, ttl: float, schema: str = "public") -> None:
+        self.ttl = ttl
+        self.schema = schema
+        self._lock = threading.Lock()
+        self._full_schema: str | None = None
+        self._loaded_at = 0.0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _load(self) -> str:
+        with primary_pool.connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT
+                    c.table_name,
+                    c.column_name,
+                    c.data_type,
+                    col_description(format('%%I.%%I', c.table_schema, c.table_name)::regclass, c.ordinal_position),
+                    obj_description(format('%%I.%%I', c.table_schema, c.table_name)::regclass, 'pg_class')
+                FROM information_schema.columns c
+                JOIN information_schema.tables t
+                  ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+                WHERE c.table_schema = %s AND t.table_type IN ('BASE TABLE', 'VIEW') AND c.table_name <> ALL(%s)
+                ORDER BY c.table_name, c.ordinal_position;
+                """,
+                (self.schema, INTERNAL_TABLES),
+            )
+            rows = cursor.fetchall()
+
+        tables: dict[str, list[str]] = {}
+        for table_name, column_name, data_type, comment, table_comment in rows:
+            header = f"Table `{table_name}`" + (f" ({table_comment})" if table_comment else "") + ":"
+            line = f"- {column_name} ({data_type})"
+            tables.setdefault(header, []).append(f"{line} -- {comment}" if comment else line)
+        return "\n\n".join(f"{header}\n" + "\n".join(columns) for header, columns in tables.items())
+
+    def get_full_schema(self) -> str:
+        with self._lock:
+            if self._full_schema is not None and time.monotonic() - self._loaded_at < self.ttl:
+                self._hits += 1
+                return self._full_schema
+
+            self._misses += 1
+            self._full_schema = self._load()
+            self._loaded_at = time.monotonic()
+            logger.info("Schema catalog refreshed")
+            logger.debug(f"Full schema:\n{self._full_schema}")
+            return self._full_schema
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._full_schema = None
+            self._invalidations += 1
+        logger.info("Schema catalog invalidated")
+
+    def stats(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._full_schema is not None else None
+            return {
+                "ttl": self.ttl,
+                "cached": self._full_schema is not None,
+                "age_s": round(age, 3) if age is not None else None,
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+            }
+
+
+schema_catalog = SchemaCatalog(ttl=settings.schema_cache_ttl)
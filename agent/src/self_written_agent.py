@@ -1,12 +1,21 @@
 import logging
 import os
+from collections.abc import AsyncIterator
 from typing import Literal
 
 import psycopg2
-from openai import Client
+from openai import AsyncOpenAI
 from psycopg2.extras import RealDictCursor
 from pydantic import BaseModel, Field
 
+from agent.src.cost_guard import QueryRejectedError
+from agent.src.db_pool import run_in_db_executor
+from agent.src.models import AgentReply
+from agent.src.result_encoder import encode_result
+from agent.src.schema_catalog import schema_catalog
+from agent.src.sql_cache import sql_result_cache
+from agent.src.sql_executor import QueryResult, execute_bounded
+
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 logger = logging.getLogger(__name__)
@@ -18,81 +27,28 @@ model = os.getenv("LLM_API_MODEL")
 logger.info(f"LLM_API_URL: {llm_api_url}")
 
 
-client = Client(base_url=llm_api_url, api_key=api_key)
-
-db_params = {
-    "host": os.getenv("POSTGRES_HOST"),
-    "port": os.getenv("POSTGRES_PORT"),
-    "database": os.getenv("POSTGRES_DB"),
-    "user": os.getenv("POSTGRES_USER"),
-    "password": os.getenv("POSTGRES_PASSWORD"),
-}
-
-
-def get_available_tables(schema: str = "public") -> list[str]:
-    conn = psycopg2.connect(**db_params)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = %s AND table_type = 'BASE TABLE';
-        """,
-        (schema,),
-    )
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    logger.debug(f"Available tables: {tables}")
-    return tables
-
-
-def get_table_schema(table_name: str) -> str:
-    conn = psycopg2.connect(**db_params)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        SELECT column_name, data_type
-        FROM information_schema.columns
-        WHERE table_name = %s;
-        """,
-        (table_name,),
-    )
-    columns = cursor.fetchall()
-    conn.close()
-    schema = "\n".join(f"- {col[0]} ({col[1]})" for col in columns)
-    logger.debug(f"Schema for {table_name}:\n{schema}")
-    return schema
-
+client = AsyncOpenAI(base_url=llm_api_url, api_key=api_key)
 
-def get_table_preview(table_name: str, limit: int = 10) -> list[dict]:
-    conn = psycopg2.connect(**db_params)
-    cursor = conn.cursor(cursor_factory=RealDictCursor)
-    cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit}")  # noqa: S608
-    rows = cursor.fetchall()
-    conn.close()
-    logger.debug(f"Preview first {limit} rows from {table_name}: {rows}")
-    return rows
 
+def sql_engine(query: str) -> QueryResult:
+    """Execute validated SQL SELECT queries on the 'resumes' table and return the row-capped result.
 
-def sql_engine(query: str) -> str:
-    """Execute validated SQL SELECT queries on the 'resumes' table and returns results as a JSON string."""
+    Database errors are returned as a result with ``error`` set rather than an empty row set, so a timeout or a
+    syntax error never reaches the LLM as "no matching rows".
+    """
     logger.info(f"Executing SQL: {query}")
     try:
-        with psycopg2.connect(**db_params) as conn, conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query)
-            try:
-                results = cursor.fetchall()
-            except psycopg2.ProgrammingError:
-                logger.info("Query executed successfully, but no results to fetch.")
-                return []
-            else:
-                logger.debug(f"SQL results: {results}")
-                return results
-    except psycopg2.errors.SyntaxError:
+        result = sql_result_cache.fetch(query, "dict_rows", lambda: execute_bounded(query, RealDictCursor))
+    except psycopg2.errors.SyntaxError as e:
         logger.exception("Syntax error in SQL query")
-    except psycopg2.Error:
+        return QueryResult(error=f"Синтаксическая ошибка в SQL: {str(e).strip()}")
+    except psycopg2.Error as e:
         logger.exception("Database error")
-    return []
+        return QueryResult(error=f"Ошибка базы данных: {str(e).strip()}")
+    if not result.returns_rows:
+        logger.info("Query executed successfully, but no results to fetch.")
+    logger.debug(f"SQL results: {result.rows}")
+    return result
 
 
 class SQLRequest(BaseModel):
@@ -108,11 +64,9 @@ class AgentAction(BaseModel):
     sql_query: str | None
 
 
-def analyze_user_message(message: str) -> AgentAction:
+async def analyze_user_message(message: str) -> AgentAction:
     logger.info(f"Analyzing user message: {message}")
-    tables = get_available_tables()
-    schema_blocks = [f"Table `{tbl}`:\n{get_table_schema(tbl)}" for tbl in tables]
-    full_schema = "\n\n".join(schema_blocks)
+    full_schema = await run_in_db_executor(schema_catalog.get_full_schema)
 
     system_prompt = (
         "Ты — AI-ассистент, генерирующий SQL-запросы на основе пользовательских запросов.\n"
@@ -123,10 +77,13 @@ def analyze_user_message(message: str) -> AgentAction:
         "3) Если безопасен — сгенерируй корректный SELECT и верни его в поле sql_query.\n"
         "4) Перефразируй запрос пользователя как комментарий перед SQL.\n"
         "5) Учитывай различные варианты написания специальностей.\n"
-        "6) Оптимизируй запрос для минимальной нагрузки на БД."
+        "6) Оптимизируй запрос для минимальной нагрузки на БД: используй индексируемые операторы из комментариев "
+        "к колонкам (skills @> ARRAY[...], title ILIKE, summary_tsv @@ plainto_tsquery) вместо = ANY и "
+        "разбора experience вручную; для вопросов о стаже в компаниях используй таблицу resume_experience, "
+        "для общего стажа — представление resume_experience_totals."
     )
 
-    response = client.beta.chat.completions.parse(
+    response = await client.beta.chat.completions.parse(
         model=model,
         temperature=0.4,
         messages=[{"role": "system", "content": system_prompt}, {"role": "user", "content": message}],
@@ -144,27 +101,32 @@ def analyze_user_message(message: str) -> AgentAction:
     return action
 
 
-def format_sql_result_with_llm(user_message: str, sql_query: str, raw_result: str) -> str:
-    """Форматирует результат SQL-запроса в человекочитаемый ответ с помощью LLM."""
+def _build_format_messages(user_message: str, sql_query: str, raw_result: str) -> list[dict]:
     system_prompt = """Ты — AI-ассистент, который помогает пользователю, отвечая на вопросы, связанные с SQL.
         Вот твоя задача:
         1. Прочитай запрос пользователя.
         2. Оцени сгенерированный SQL-код.
-        3. Проанализируй результат выполнения запроса (в формате JSON).
+        3. Проанализируй результат выполнения запроса.
         4. Сформулируй краткий, точный и понятный ответ для пользователя, основываясь на данных.
         5. Ответ должен быть по существу и не содержать лишней информации и должен быть на языке вопроса.
+        6. Первая строка результата — число строк; если там указано truncated, упомяни, что показана только
+           часть строк и что всего их больше.
         Основное внимание уделяй ясности, точности и соответствию запросу.
         """
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": f"Запрос пользователя:\n{user_message}"},
         {"role": "user", "content": f"Сгенерированный SQL:\n{sql_query}"},
-        {"role": "user", "content": f"Результат SQL (JSON):\n{raw_result}"},
+        {"role": "user", "content": f"Результат SQL:\n{raw_result}"},
     ]
-    response = client.beta.chat.completions.parse(
+
+
+async def format_sql_result_with_llm(user_message: str, sql_query: str, raw_result: str) -> str:
+    """Форматирует результат SQL-запроса в человекочитаемый ответ с помощью LLM."""
+    response = await client.beta.chat.completions.parse(
         model=model,
         temperature=0.15,
-        messages=messages,
+        messages=_build_format_messages(user_message, sql_query, raw_result),
     )
 
     reply = response.choices[0].message.content.strip()
@@ -172,24 +134,70 @@ def format_sql_result_with_llm(user_message: str, sql_query: str, raw_result: st
     return reply
 
 
-def process_user_message(message: str) -> str:
+async def stream_sql_result_with_llm(user_message: str, sql_query: str, raw_result: str) -> AsyncIterator[str]:
+    """Потоково форматирует результат SQL-запроса, отдавая токены ответа по мере генерации."""
+    stream = await client.chat.completions.create(
+        model=model,
+        temperature=0.15,
+        messages=_build_format_messages(user_message, sql_query, raw_result),
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def execute_action_sql(sql_query: str) -> QueryResult:
+    """Run ``sql_query`` off the event loop; every failure comes back as a result with ``error`` set."""
+    try:
+        result = await run_in_db_executor(sql_engine, sql_query)
+    except QueryRejectedError as e:
+        return QueryResult(error=f"Запрос отклонён: {e!s}")
+    except Exception:
+        logger.exception("SQL execution error")
+        return QueryResult(error="Ошибка при выполнении SQL")
+    if result.error is None:
+        logger.info(f"Query executed successfully, returned {len(result.rows)} rows (truncated={result.truncated})")
+    return result
+
+
+async def process_user_message(message: str) -> AgentReply:
     logger.info(f"User message received: {message}")
-    action = analyze_user_message(message)
+    action = await analyze_user_message(message)
 
     if action.is_dangerous:
         logger.warning(f"Dangerous request rejected: {action.reasoning}")
-        return f"Запрос отклонён: {action.reasoning}"
+        return AgentReply(f"Запрос отклонён: {action.reasoning}", cacheable=True)
     if action.function == "sql_engine" and action.sql_query:
-        try:
-            raw_results = sql_engine(action.sql_query)
-            logger.info(f"Query executed successfully, returned {len(raw_results)} rows")
-        except Exception:
-            raw_results = "Ошибка при выполнении SQL"
-            logger.exception("SQL execution error")
-        return format_sql_result_with_llm(
+        result = await execute_action_sql(action.sql_query)
+        answer = await format_sql_result_with_llm(
             user_message=message,
             sql_query=action.sql_query,
-            raw_result=raw_results,
+            raw_result=encode_result(result),
         )
+        return AgentReply(answer, cacheable=result.error is None)
+    logger.error("No valid SQL query generated")
+    return AgentReply("Ваш запрос не имеет отношения к базе данных.", cacheable=True)
+
+
+async def stream_user_message(message: str) -> AsyncIterator[dict]:
+    """Run the ``process_user_message`` flow, yielding progress events as soon as each stage completes."""
+    logger.info(f"User message received for streaming: {message}")
+    action = await analyze_user_message(message)
+
+    if action.is_dangerous:
+        logger.warning(f"Dangerous request rejected: {action.reasoning}")
+        yield {"event": "answer", "data": f"Запрос отклонён: {action.reasoning}"}
+        return
+    if action.function == "sql_engine" and action.sql_query:
+        yield {"event": "sql", "data": action.sql_query}
+        result = await execute_action_sql(action.sql_query)
+        if result.error is not None:
+            yield {"event": "sql_error", "data": result.error}
+        else:
+            yield {"event": "rows", "data": len(result.rows), "truncated": result.truncated}
+        async for token in stream_sql_result_with_llm(message, action.sql_query, encode_result(result)):
+            yield {"event": "token", "data": token}
+        return
     logger.error("No valid SQL query generated")
-    return "Ваш запрос не имеет отношения к базе данных."
+    yield {"event": "answer", "data": "Ваш запрос не имеет отношения к базе данных."}
@@ -1,42 +1,42 @@
 import json
 import os
-from typing import Any
 
 import psycopg2
 import sqlparse
 from openai import OpenAI
-from smolagents import OpenAIServerModel, ToolCallingAgent, tool
+from smolagents import ActionStep, AgentToolExecutionError, OpenAIServerModel, ToolCallingAgent, tool
+from smolagents.memory import MemoryStep
 
-
-db_params = {
-    "host": os.getenv("POSTGRES_HOST"),
-    "port": os.getenv("POSTGRES_PORT"),
-    "database": os.getenv("POSTGRES_DB"),
-    "user": os.getenv("POSTGRES_USER"),
-    "password": os.getenv("POSTGRES_PASSWORD"),
-}
+from agent.src.cost_guard import QueryRejectedError, explain
+from agent.src.db_pool import pool
+from agent.src.models import AgentReply
+from agent.src.result_encoder import encode_error, encode_result, is_sql_error
+from agent.src.sql_cache import sql_result_cache
+from agent.src.sql_executor import execute_bounded
 
 
 @tool
 def validate_sql_query(query: str) -> str:
-    """Check the syntax of a SQL query without executing it on the table. Useful for safe validation.
+    """Check the syntax and estimated cost of a SQL query without executing it on the table.
 
     Args:
         query (str): The SQL query to validate.
 
     Returns:
-        str: A message indicating whether the query is syntactically valid or describing the syntax error.
+        str: A message indicating whether the query is valid and cheap enough, or describing the problem.
 
     """
-    conn = psycopg2.connect(**db_params)
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("EXPLAIN " + query)
+        with pool.connection() as conn, conn.cursor() as cursor:
+            estimate = explain(cursor, query)
     except psycopg2.Error as e:
         return f"Ошибка в SQL-запросе: {e!s}"
-    finally:
-        conn.close()
-    return "Запрос синтаксически корректен."
+    if estimate.exceeds_limits():
+        return (
+            f"Запрос синтаксически корректен, но слишком дорогой (стоимость {estimate.total_cost:.0f}, "
+            f"строк {estimate.plan_rows}). Добавь фильтры или агрегацию."
+        )
+    return f"Запрос синтаксически корректен (стоимость {estimate.total_cost:.0f}, строк {estimate.plan_rows})."
 
 
 @tool
@@ -57,23 +57,18 @@ def get_unique_column_values(column: str) -> str:
 
     query = f'SELECT DISTINCT "{column}" FROM resumes ORDER BY "{column}"'  # noqa: S608
 
-    conn = None
     try:
-        conn = psycopg2.connect(**db_params)
-        with conn.cursor() as cursor:
+        with pool.connection() as conn, conn.cursor() as cursor:
             cursor.execute(query)
             values = cursor.fetchall()
             return json.dumps([v[0] for v in values], ensure_ascii=False)
-    except psycopg2.Error as e:
-        return f"Database error: {e!s}"
-    finally:
-        if conn:
-            conn.close()
+    except (psycopg2.Error, TimeoutError) as e:
+        return encode_error(f"database error: {e!s}")
 
 
 @tool
 def sql_engine(query: str) -> str:
-    """Execute validated SQL SELECT queries on the 'resumes' table and returns results as a JSON string.
+    r"""Execute validated SQL SELECT queries on the 'resumes' table and returns results as a JSON string.
 
     Table Schema for 'resumes':
         - id (integer)              - primary key
@@ -89,19 +84,44 @@ def sql_engine(query: str) -> str:
         - gender (text)             - gender
         - title (text)              - current/target job title
         - summary (text)            - resume summary/about section
+        - companies (ARRAY)         - generated: distinct employer names from experience
+        - summary_tsv (tsvector)    - generated: full-text index over summary
+
+        Table Schema for "resume_experience" (one row per job, kept in sync with resumes.experience):
+        - resume_id (integer)       - resumes.id
+        - company (text)            - employer, B-tree indexed
+        - job_title (text)          - position title
+        - start_date, end_date (date) - parsed dates; end_date is NULL for the current job
+        - is_current (boolean)      - the position has no end date
+        - duration_months (integer) - months in the position, B-tree indexed
+
+        View "resume_experience_totals" (one row per resume with experience):
+        - resume_id (integer)       - resumes.id
+        - experience_years (numeric) - total years in all positions, current ones counted up to today
+
+        Table Schema for "resume_education" (one row per education entry):
+        - resume_id (integer)       - resumes.id
+        - institution, degree, details (text)
+        - start_date, end_date (date), duration_months (integer)
 
     Examples:
         >>> sql_engine(\'''
             SELECT id, name, title
             FROM resumes
-            WHERE 'Kubernetes' = ANY(skills)
+            WHERE skills @> ARRAY['Kubernetes']
             ORDER BY id
             LIMIT 5;
         \''')
-        "[ [4, 'Маргарита Кирилловна Дорофеева', 'DevOps Engineer'], ... ]"
+        'rows: 5\n{"columns":["id","name","title"],"rows":[[4,"Маргарита Кирилловна Дорофеева","DevOps Engineer"],...]}'
 
     Important:
         • Only SELECT queries are allowed.
+        • Prefer indexed predicates: skills/languages/certifications/companies @> ARRAY[...] (not = ANY),
+          title ILIKE '%...%', summary_tsv @@ plainto_tsquery('russian', '...').
+        • For total experience ("опыт более N лет") join resume_experience_totals t ON t.resume_id = resumes.id
+          and filter t.experience_years >= N.
+        • For tenure/employer questions join resume_experience instead of parsing experience JSON, e.g.
+          WHERE e.company = 'X' AND e.duration_months >= 36.
         • Never pass raw user input directly without validation.
         • Avoid requesting more than 1000 rows per call.
         • Double-quote column names if they contain uppercase or non-ASCII characters.
@@ -111,7 +131,7 @@ def sql_engine(query: str) -> str:
 
     Returns:
         str:
-            - JSON-encoded list of result rows for SELECT queries.
+            - A "rows: N" header line followed by the compactly encoded result rows for SELECT queries.
             - Or an error message string for invalid or forbidden queries.
 
     """
@@ -119,39 +139,27 @@ def sql_engine(query: str) -> str:
     try:
         parsed = sqlparse.parse(query)
         if len(parsed) != 1:
-            return "Error: Only one SQL statement is allowed."
+            return encode_error("Only one SQL statement is allowed.")
 
         stmt = parsed[0]
         if stmt.get_type() != "SELECT":
-            return "Error: Only SELECT queries are permitted."
+            return encode_error("Only SELECT queries are permitted.")
 
     except Exception as e:  # noqa: BLE001
-        return f"Error while parsing SQL query: {e!s}"
+        return encode_error(f"could not parse SQL query: {e!s}")
 
     ###
     output = ""
-    conn = None
     try:
-        conn = psycopg2.connect(**db_params)
-        with conn.cursor() as cursor:
-            cursor.execute(query)
-            try:
-                rows: list[tuple[Any, ...]] = cursor.fetchall()
-                output = rows
-            except psycopg2.ProgrammingError:
-                output = "Query executed successfully, but no results to fetch."
-
-        conn.commit()
-
+        output = encode_result(sql_result_cache.fetch(query, "rows", lambda: execute_bounded(query)))
+    except QueryRejectedError as e:
+        output = encode_error(str(e))
     except psycopg2.errors.SyntaxError as e:
-        output = f"Syntax error in SQL query: {e!s}"
-    except psycopg2.Error as e:
-        output = f"Database error: {e!s}"
-    finally:
-        if conn:
-            conn.close()
+        output = encode_error(f"syntax error in SQL query: {e!s}")
+    except (psycopg2.Error, TimeoutError) as e:
+        output = encode_error(f"database error: {e!s}")
 
-    return json.dumps(output, ensure_ascii=False)
+    return output
 
 
 @tool
@@ -204,22 +212,39 @@ model = OpenAIServerModel(
     flatten_messages_as_text=True,
 )
 
-smolagent_agent = ToolCallingAgent(
-    tools=[sql_engine, get_unique_column_values],
-    model=model,
-    planning_interval=5,
-    description=(
-        """
-        You are an HR assistant helping users analyze resume data stored in a PostgreSQL database.
-        Always detect the user's query language and respond in the same language (if the question is in Russian, answer
-        in Russian). Use the sql_engine tool to execute queries and retrieve data.
-        Optionally, `use get_unique_column_values` to extract distinct values from specific columns when needed.
-        Never fabricate or assume data—answers must be strictly based on SQL query results.
-        Provide short, factual answers directly tied to the data.
-        Casual greetings are allowed, but all answers must be precise and data-focused.
-        Do not discuss topics unrelated to resumes.
-        If asked 'Who are you?', reply: 'I am an HR assistant.'
-        """
-    ),
-    max_steps=10,
-)
+
+def create_smolagent_agent() -> ToolCallingAgent:
+    """Build a fresh agent; ToolCallingAgent keeps per-run memory, so instances must not be shared across requests."""
+    return ToolCallingAgent(
+        tools=[sql_engine, get_unique_column_values],
+        model=model,
+        planning_interval=5,
+        description=(
+            """
+            You are an HR assistant helping users analyze resume data stored in a PostgreSQL database.
+            Always detect the user's query language and respond in the same language (if the question is in Russian,
+            answer in Russian). Use the sql_engine tool to execute queries and retrieve data.
+            Optionally, `use get_unique_column_values` to extract distinct values from specific columns when needed.
+            Never fabricate or assume data—answers must be strictly based on SQL query results.
+            Provide short, factual answers directly tied to the data.
+            Casual greetings are allowed, but all answers must be precise and data-focused.
+            Do not discuss topics unrelated to resumes.
+            If asked 'Who are you?', reply: 'I am an HR assistant.'
+            """
+        ),
+        max_steps=10,
+    )
+
+
+def smolagent_step_failed(step: MemoryStep) -> bool:
+    """Whether a step's tool call raised or a SQL tool reported an error."""
+    return isinstance(step, ActionStep) and (
+        isinstance(step.error, AgentToolExecutionError) or is_sql_error(step.observations)
+    )
+
+
+def run_smolagent(query: str) -> AgentReply:
+    """Run a fresh agent on ``query`` (blocking); the answer is cacheable only if no tool step failed."""
+    agent = create_smolagent_agent()
+    answer = agent.run(query)
+    return AgentReply(str(answer), cacheable=not any(smolagent_step_failed(step) for step in agent.memory.steps))
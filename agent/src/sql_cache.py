@@ -0,0 +1,127 @@
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+import psycopg2
+import sqlparse
+
+from agent.config.config import settings
+from agent.src.data_version import get_data_version
+
+
+logger = logging.getLogger(__name__)
+
+
+def canonicalize_sql(query: str) -> str | None:
+    """Return a normalized form of a single SELECT statement, or ``None`` if the query must not be cached.
+
+    Comments, redundant whitespace, keyword case and a trailing semicolon are stripped; literals and
+    identifiers are kept as is because they change the result.
+    """
+    statements = sqlparse.parse(query)
+    if len(statements) != 1 or statements[0].get_type() != "SELECT":
+        return None
+    formatted = sqlparse.format(str(statements[0]), strip_comments=True, keyword_case="upper", strip_whitespace=True)
+    return " ".join(formatted.split()).rstrip(";").strip()
+
+
+class SQLResultCache:
+    """LRU cache of SQL results shared by the ``sql_engine`` tools of all agents.
+
+    Results are stored pickled: the pickle size is what counts against ``max_bytes`` and every hit returns a
+    fresh copy that callers may mutate. Keys include the ``resumes`` data version, so any change to the table
+    makes earlier results unreachable.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str, str], tuple[float, bytes]] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._uncacheable = 0
+
+    def _get(self, key: tuple[str, str, str]) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, payload = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._size -= len(self._entries.pop(key)[1])
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return payload
+
+    def _put(self, key: tuple[str, str, str], payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            with self._lock:
+                self._uncacheable += 1
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key)[1])
+            self._entries[key] = (time.monotonic(), payload)
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._evictions += 1
+
+    def fetch[T](self, query: str, namespace: str, execute: Callable[[], T]) -> T:
+        """Return the cached result of ``query`` or run ``execute`` and cache what it returns.
+
+        ``namespace`` separates result shapes (e.g. tuples vs. dict rows) produced by different cursors.
+        Non-SELECT statements, failures of ``execute`` and results read while the data version is unsettled are
+        never cached.
+        """
+        canonical = canonicalize_sql(query)
+        if canonical is None:
+            return execute()
+        try:
+            version = get_data_version()
+        except (psycopg2.Error, TimeoutError):
+            logger.warning("Could not read resumes data version, SQL cache bypassed", exc_info=True)
+            return execute()
+        if version is None:
+            return execute()
+        key = (namespace, canonical, version)
+
+        if (payload := self._get(key)) is not None:
+            logger.info(f"SQL cache hit: {canonical}")
+            return pickle.loads(payload)  # noqa: S301
+
+        result = execute()
+        self._put(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "uncacheable": self._uncacheable,
+            }
+
+
+sql_result_cache = SQLResultCache(max_bytes=settings.sql_cache_max_bytes, ttl=settings.sql_cache_ttl)
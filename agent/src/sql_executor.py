@@ -0,0 +1,105 @@
+import json
+import logging
+from dataclasses import dataclass, field
+
+import psycopg2
+import sqlparse
+
+from agent.config.config import settings
+from agent.src.cost_guard import QueryRejectedError, guard_query
+from agent.src.db_pool import pool
+
+
+logger = logging.getLogger(__name__)
+
+NO_RESULTS_MESSAGE = "Query executed successfully, but no results to fetch."
+_CURSOR_NAME = "agent_sql"
+
+
+@dataclass
+class QueryResult:
+    rows: list = field(default_factory=list)
+    columns: list[str] = field(default_factory=list)
+    returns_rows: bool = True
+    truncated: bool = False
+    error: str | None = None
+
+
+def _row_size(row: object) -> int:
+    # Bytes, not characters: Cyrillic text takes two bytes per character in UTF-8.
+    return len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _is_select(query: str) -> bool:
+    statements = sqlparse.parse(query)
+    return len(statements) == 1 and statements[0].get_type() == "SELECT"
+
+
+def _read_capped(cursor: psycopg2.extensions.cursor, result: QueryResult) -> None:
+    """Fill ``result.rows`` in ``fetchmany`` batches until a cap is hit.
+
+    At most ``AGENT_SQL_ROW_LIMIT + 1`` rows are fetched: the extra one only tells that the result was truncated.
+    The exact total is not counted, since that would run the whole query the cost guard may have let through
+    on an estimate.
+    """
+    seen = 0
+    used_bytes = 0
+    while not result.truncated and (
+        batch := cursor.fetchmany(min(settings.sql_fetch_batch_size, settings.sql_row_limit + 1 - seen))
+    ):
+        seen += len(batch)
+        for row in batch:
+            used_bytes += _row_size(row)
+            if len(result.rows) >= settings.sql_row_limit or used_bytes > settings.sql_byte_limit:
+                result.truncated = True
+                break
+            result.rows.append(row)
+    return seen
+
+
+def _prepare_session(conn: psycopg2.extensions.connection, query: str) -> tuple[str, bool]:
+    """Apply per-transaction resource limits and run the cost guard."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('statement_timeout', %s, true), set_config('lock_timeout', %s, true), "
+            "set_config('work_mem', %s, true)",
+            (
+                f"{settings.sql_statement_timeout_ms}ms",
+                f"{settings.sql_lock_timeout_ms}ms",
+                settings.sql_work_mem,
+            ),
+        )
+        return guard_query(cursor, query)
+
+
+def execute_bounded(query: str, cursor_factory: type | None = None) -> QueryResult:
+    """Execute ``query`` and read at most ``AGENT_SQL_ROW_LIMIT`` rows / ``AGENT_SQL_BYTE_LIMIT`` bytes.
+
+    Only a single SELECT is accepted. It runs in a READ ONLY transaction (see ``db_pool``) with
+    ``statement_timeout``, ``lock_timeout`` and ``work_mem`` set for that transaction only; the transaction is
+    rolled back when the connection is returned.
+
+    The query is first checked by the EXPLAIN cost guard (and may be rewritten with a ``LIMIT``), then run
+    through a named server-side cursor read with ``fetchmany``, so rows beyond the caps never leave Postgres.
+
+    Raises:
+        QueryRejectedError: if the query is not a single SELECT or the planner estimate exceeds the cost thresholds.
+
+    """
+    # Anything else would bypass the cost guard, which can only EXPLAIN queries it can wrap.
+    if not _is_select(query):
+        raise QueryRejectedError("Only a single SELECT statement is allowed.")
+
+    with pool.connection() as conn:
+        query, _ = _prepare_session(conn, query)
+        cursor_kwargs = {"cursor_factory": cursor_factory} if cursor_factory else {}
+        with conn.cursor(name=_CURSOR_NAME, **cursor_kwargs) as cursor:
+            cursor.execute(query)
+            result = QueryResult()
+            _read_capped(cursor, result)
+            result.columns = [column.name for column in cursor.description or []]
+
+            if result.truncated:
+                logger.info(f"SQL result truncated to {len(result.rows)} rows")
+
+    return result
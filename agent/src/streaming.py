@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+from collections.abc import AsyncIterator
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import ToolCallPart, ToolReturnPart
+from smolagents import ActionStep, FinalAnswerStep
+
+from agent.src.models import AgentEnum
+from agent.src.pydantic_ai_agent import pydantic_ai_agent
+from agent.src.result_encoder import SQL_ERROR_PREFIX, count_encoded_rows, is_sql_error
+from agent.src.self_written_agent import stream_user_message
+from agent.src.smolagent_agent import create_smolagent_agent, smolagent_step_failed
+
+
+logger = logging.getLogger(__name__)
+
+_STREAM_END = object()
+# Workers of streams whose client went away; referenced here so they are not garbage-collected mid-step.
+_detached_workers: set[asyncio.Task] = set()
+
+
+def encode_event(event: dict) -> bytes:
+    """Encode a single agent event as one NDJSON line."""
+    return (json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _rows_event(encoded_result: object) -> dict | None:
+    """Build a ``rows`` event from the ``rows: N`` header of an encoded ``sql_engine`` result.
+
+    Failed calls produce a ``sql_error`` event instead; answers of streams that had one are not cached.
+    """
+    if is_sql_error(encoded_result):
+        return {"event": "sql_error", "data": encoded_result.removeprefix(SQL_ERROR_PREFIX)}
+    if (counted := count_encoded_rows(encoded_result)) is None:
+        return None
+    rows, truncated = counted
+    return {"event": "rows", "data": rows, "truncated": truncated}
+
+
+def _smolagent_step_events(step: ActionStep | FinalAnswerStep) -> list[dict]:
+    if isinstance(step, FinalAnswerStep):
+        return [{"event": "answer", "data": str(step.final_answer)}]
+    events = [
+        {"event": "sql", "data": tool_call.arguments.get("query")}
+        for tool_call in step.tool_calls or []
+        if tool_call.name == "sql_engine" and isinstance(tool_call.arguments, dict)
+    ]
+    if (rows_event := _rows_event(step.observations)) is not None:
+        events.append(rows_event)
+    elif smolagent_step_failed(step):
+        events.append({"event": "sql_error", "data": str(step.error)})
+    return events
+
+
+async def stream_pydantic_ai(query: str) -> AsyncIterator[dict]:
+    async with pydantic_ai_agent.iter(query) as agent_run:
+        async for node in agent_run:
+            if Agent.is_call_tools_node(node):
+                for part in node.model_response.parts:
+                    if isinstance(part, ToolCallPart) and part.tool_name == "sql_engine":
+                        yield {"event": "sql", "data": part.args_as_dict().get("query")}
+            elif Agent.is_model_request_node(node):
+                for part in node.request.parts:
+                    if isinstance(part, ToolReturnPart) and (rows_event := _rows_event(part.content)) is not None:
+                        yield rows_event
+        yield {"event": "answer", "data": str(agent_run.result.output)}
+
+
+def _pump_smolagent(query: str, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, stop: threading.Event) -> None:
+    """Run smolagents (in a worker thread) and hand each step to ``queue`` until done or ``stop`` is set."""
+    try:
+        with contextlib.closing(create_smolagent_agent().run(query, stream=True)) as steps:
+            for step in steps:
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, step)
+    except Exception as e:  # noqa: BLE001
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+    finally:
+        if not stop.is_set():
+            loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END)
+
+
+async def stream_smolagent(query: str) -> AsyncIterator[dict]:
+    """Run smolagents in a worker thread and relay its steps to the event loop as they are produced.
+
+    If the consumer stops early (e.g. the client disconnected), the worker is told to stop after its current step
+    and the generator returns at once instead of waiting for it, so the caller's concurrency slot is freed.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    worker = asyncio.create_task(asyncio.to_thread(_pump_smolagent, query, asyncio.get_running_loop(), queue, stop))
+    try:
+        while (step := await queue.get()) is not _STREAM_END:
+            if isinstance(step, Exception):
+                raise step
+            if isinstance(step, ActionStep | FinalAnswerStep):
+                for event in _smolagent_step_events(step):
+                    yield event
+    finally:
+        if worker.done():
+            await worker
+        else:
+            stop.set()
+            _detached_workers.add(worker)
+            worker.add_done_callback(_detached_workers.discard)
+            logger.info("Smolagent stream closed early, the run stops after its current step")
+
+
+def stream_agent(agent: AgentEnum, query: str) -> AsyncIterator[dict]:
+    if agent == AgentEnum.smollagents:
+        return stream_smolagent(query)
+    if agent == AgentEnum.pydantic_ai_agent:
+        return stream_pydantic_ai(query)
+    return stream_user_message(query)
@@ -14,3 +14,18 @@ CREATE TABLE resumes (
     portfolio JSONB,
     CONSTRAINT unique_name UNIQUE (name)
 );
+
+-- Change counter per table, bumped by a statement-level trigger; lets caches detect data changes cheaply.
+-- A sequence rather than a counter row: nextval never blocks, so concurrent writers do not queue on one hot row.
+CREATE SEQUENCE resumes_data_version_seq;
+
+CREATE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM nextval(format('%I_data_version_seq', TG_TABLE_NAME));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER resumes_bump_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON resumes
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
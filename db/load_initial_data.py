@@ -1,80 +1,258 @@
+import argparse
+import csv
+import io
 import json
 import logging
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import psycopg2
+from migrate import apply_migrations
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
 
 JSONS_DIR = Path(__file__).resolve().parent / "data" / "resumes_json"
-if not JSONS_DIR.exists():
-    logger.error(f"Directory not found: {JSONS_DIR}")
-    sys.exit(1)
-
-json_files = list(JSONS_DIR.glob("*.json"))
-if not json_files:
-    logger.warning(f"No JSON files found in {JSONS_DIR}")
-    sys.exit(1)
-else:
-    logger.info(f"Found {len(json_files)} JSON file(s) to insert.")
-
-
-conn = psycopg2.connect(
-    host=os.environ["POSTGRES_HOST"],
-    port=os.environ["POSTGRES_PORT"],
-    database=os.environ["POSTGRES_DB"],
-    user=os.environ["POSTGRES_USER"],
-    password=os.environ["POSTGRES_PASSWORD"],
-)
 
-insert_query = """
+COLUMNS = [
+    "name",
+    "gender",
+    "title",
+    "summary",
+    "contact_info",
+    "skills",
+    "experience",
+    "education",
+    "languages",
+    "certifications",
+    "hobbies",
+    "portfolio",
+]
+JSON_COLUMNS = {"contact_info", "experience", "education", "portfolio"}
+ARRAY_COLUMNS = {"skills", "languages", "certifications", "hobbies"}
+MAX_NAME_LENGTH = 255
+
+STAGING_TABLE = """
+CREATE TEMP TABLE resumes_staging (
+    name TEXT,
+    gender TEXT,
+    title TEXT,
+    summary TEXT,
+    contact_info JSONB,
+    skills TEXT[],
+    experience JSONB,
+    education JSONB,
+    languages TEXT[],
+    certifications TEXT[],
+    hobbies TEXT[],
+    portfolio JSONB
+);
+"""
+
+MERGE_QUERY = """
 INSERT INTO resumes (
     name, gender, title, summary, contact_info,
     skills, experience, education,
     languages, certifications, hobbies, portfolio
 )
-VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+SELECT
+    name, left(gender, 50), left(title, 255), summary, contact_info,
+    skills, experience, education,
+    languages, certifications, hobbies, portfolio
+FROM resumes_staging
+ON CONFLICT (name) DO NOTHING;
 """
 
-cursor = conn.cursor()
-inserted_count = 0
 
-for filepath in json_files:
+def _pg_array(values: object) -> str | None:
+    """Render a list as a Postgres array literal for COPY; anything else is loaded as NULL."""
+    if not isinstance(values, list):
+        return None
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        else:
+            escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'"{escaped}"')
+    return "{" + ",".join(items) + "}"
+
+
+def resume_to_csv_row(filepath: Path) -> tuple[str | None, str | None]:
+    """Parse one resume JSON file into a CSV line for ``COPY``; returns ``(line, None)`` or ``(None, error)``.
+
+    Runs in worker processes, so it must stay a picklable top-level function without shared state.
+    """
     try:
         with filepath.open("r", encoding="utf-8") as f:
             resume = json.load(f)
-        name = resume.get("name")
-        cursor.execute(
-            insert_query,
-            (
-                name,
-                resume.get("gender"),
-                resume.get("title"),
-                resume.get("summary"),
-                json.dumps(resume.get("contact_info")),
-                resume.get("skills"),
-                json.dumps(resume.get("experience")),
-                json.dumps(resume.get("education")),
-                resume.get("languages"),
-                resume.get("certifications"),
-                resume.get("hobbies"),
-                json.dumps(resume.get("portfolio")),
-            ),
+    except (OSError, json.JSONDecodeError) as e:
+        return None, f"{filepath.name}: {e}"
+
+    if not isinstance(resume, dict):
+        return None, f"{filepath.name}: expected a JSON object"
+    name = resume.get("name")
+    if not isinstance(name, str) or not name.strip() or len(name) > MAX_NAME_LENGTH:
+        return None, f"{filepath.name}: missing or invalid name"
+
+    values = []
+    for column in COLUMNS:
+        value = resume.get(column)
+        if column in JSON_COLUMNS:
+            value = None if value is None else json.dumps(value, ensure_ascii=False)
+        elif column in ARRAY_COLUMNS:
+            value = _pg_array(value)
+        values.append(value)
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue(), None
+
+
+def get_checkpoint(cursor: psycopg2.extensions.cursor, source: str) -> str | None:
+    cursor.execute("SELECT last_file FROM data_load_checkpoints WHERE source = %s", (source,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def save_checkpoint(cursor: psycopg2.extensions.cursor, source: str, last_file: str, loaded: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO data_load_checkpoints (source, last_file, files_done)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (source) DO UPDATE
+        SET last_file = EXCLUDED.last_file,
+            files_done = data_load_checkpoints.files_done + EXCLUDED.files_done,
+            updated_at = now();
+        """,
+        (source, last_file, loaded),
+    )
+
+
+def clear_checkpoint(cursor: psycopg2.extensions.cursor, source: str) -> None:
+    cursor.execute("DELETE FROM data_load_checkpoints WHERE source = %s", (source,))
+
+
+def load_chunk(conn: psycopg2.extensions.connection, lines: list[str]) -> int:
+    """COPY ``lines`` into the staging table and merge them into ``resumes``; returns the number inserted."""
+    with conn.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY resumes_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            io.StringIO("".join(lines)),
         )
-        logger.debug(f"Inserted resume '{name}' from '{filepath.name}'")
-        inserted_count += 1
-    except json.JSONDecodeError:
-        logger.exception(f"Error decoding JSON in {filepath.name}")
+        cursor.execute(MERGE_QUERY)
+        inserted = cursor.rowcount
+        cursor.execute("TRUNCATE resumes_staging")
+    return inserted
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-load resume JSON files into Postgres.")
+    parser.add_argument("--source", type=Path, default=JSONS_DIR, help="directory with resume JSON files")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=int(os.getenv("LOADER_CHUNK_SIZE", "5000")),
+        help="files per COPY/merge/commit",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("LOADER_WORKERS", str(os.cpu_count() or 1))),
+        help="JSON parsing processes",
+    )
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and rescan every file")
+    return parser.parse_args()
+
+
+def main() -> None:  # noqa: PLR0915
+    args = parse_args()
+    if not args.source.exists():
+        logger.error(f"Directory not found: {args.source}")
+        sys.exit(1)
+
+    json_files = sorted(args.source.glob("*.json"))
+    if not json_files:
+        logger.warning(f"No JSON files found in {args.source}")
+        sys.exit(1)
+
+    conn = psycopg2.connect(
+        host=os.environ["POSTGRES_HOST"],
+        port=os.environ["POSTGRES_PORT"],
+        database=os.environ["POSTGRES_DB"],
+        user=os.environ["POSTGRES_USER"],
+        password=os.environ["POSTGRES_PASSWORD"],
+    )
+    apply_migrations(conn)
+
+    source = str(args.source.resolve())
+    with conn.cursor() as cursor:
+        cursor.execute(STAGING_TABLE)
+        last_file = None if args.restart else get_checkpoint(cursor, source)
+    conn.commit()
+
+    # Files are processed in name order, so the checkpoint is simply the last file of the last committed chunk.
+    # It only lives while a run is interrupted: a completed run clears it, so files added later are never skipped
+    # just because their names sort before the old high-water mark.
+    if last_file is not None:
+        pending = [path for path in json_files if path.name > last_file]
+        logger.info(f"Resuming after checkpoint '{last_file}': {len(json_files) - len(pending)} file(s) skipped")
+    else:
+        pending = json_files
+    logger.info(f"Found {len(json_files)} JSON file(s), {len(pending)} to load with {args.workers} worker(s).")
+
+    started = time.monotonic()
+    processed = inserted = duplicates = errors = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            for offset in range(0, len(pending), args.chunk_size):
+                chunk = pending[offset : offset + args.chunk_size]
+                lines = []
+                for line, error in executor.map(resume_to_csv_row, chunk, chunksize=64):
+                    if error is not None:
+                        logger.error(f"Skipping {error}")
+                        errors += 1
+                    else:
+                        lines.append(line)
+
+                chunk_inserted = load_chunk(conn, lines) if lines else 0
+                with conn.cursor() as cursor:
+                    save_checkpoint(cursor, source, chunk[-1].name, len(chunk))
+                conn.commit()
+
+                processed += len(chunk)
+                inserted += chunk_inserted
+                duplicates += len(lines) - chunk_inserted
+                elapsed = time.monotonic() - started
+                rate = processed / elapsed if elapsed else 0.0
+                eta = (len(pending) - processed) / rate if rate else 0.0
+                logger.info(
+                    f"Progress {processed}/{len(pending)} files ({processed / len(pending):.1%}): "
+                    f"{inserted} inserted, {duplicates} duplicate(s), {errors} error(s), "
+                    f"{rate:.0f} files/s, ETA {eta:.0f}s"
+                )
+
+        with conn.cursor() as cursor:
+            clear_checkpoint(cursor, source)
+        conn.commit()
     except Exception:
-        logger.exception(f"Error processing {filepath.name}")
+        conn.rollback()
+        logger.exception("Bulk load interrupted; rerun to resume from the last committed chunk")
+        raise
+    finally:
+        conn.close()
+        logger.info("Database connection closed.")
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Inserted {inserted} resumes ({duplicates} duplicate(s), {errors} error(s)) "
+        f"in {elapsed:.1f}s, {processed / elapsed if elapsed else 0.0:.0f} files/s."
+    )
 
-conn.commit()
-logger.info(f"Inserted {inserted_count} resumes.")
 
-cursor.close()
-conn.close()
-logger.info("Database connection closed.")
+if __name__ == "__main__":
+    main()
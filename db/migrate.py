@@ -0,0 +1,66 @@
+import logging
+import os
+from pathlib import Path
+
+import psycopg2
+
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def apply_migrations(conn: psycopg2.extensions.connection, migrations_dir: Path = MIGRATIONS_DIR) -> list[str]:
+    """Apply pending ``NNN_*.sql`` files in order, each in its own transaction; return the applied versions.
+
+    Applied versions are recorded in ``schema_migrations``; a session-level advisory lock keeps concurrent
+    runners from applying the same migration twice.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+            SELECT pg_advisory_lock(hashtext('schema_migrations'));
+            """
+        )
+        conn.commit()
+        try:
+            cursor.execute("SELECT version FROM schema_migrations")
+            done = {row[0] for row in cursor.fetchall()}
+            applied = []
+            for path in sorted(migrations_dir.glob("*.sql")):
+                version = path.stem
+                if version in done:
+                    continue
+                logger.info(f"Applying migration {version}")
+                try:
+                    cursor.execute(path.read_text(encoding="utf-8"))
+                    cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                    conn.commit()
+                except psycopg2.Error:
+                    conn.rollback()
+                    logger.exception(f"Migration {version} failed")
+                    raise
+                applied.append(version)
+        finally:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext('schema_migrations'))")
+            conn.commit()
+
+    logger.info(f"Applied {len(applied)} migration(s), {len(done)} already up to date")
+    return applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    with psycopg2.connect(
+        host=os.environ["POSTGRES_HOST"],
+        port=os.environ["POSTGRES_PORT"],
+        database=os.environ["POSTGRES_DB"],
+        user=os.environ["POSTGRES_USER"],
+        password=os.environ["POSTGRES_PASSWORD"],
+    ) as connection:
+        apply_migrations(connection)
+    connection.close()
@@ -0,0 +1,61 @@
+-- Indexes and derived columns for the analytics queries generated by the agents.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Parses the date formats found in resumes ('2018-06-01', '2018-06', '2018', '06.2018', '01.06.2018');
+-- anything else, including 'present', yields NULL.
+CREATE OR REPLACE FUNCTION resume_date(value TEXT) RETURNS DATE AS $$
+BEGIN
+    value := btrim(value);
+    IF value ~ '^\d{4}-\d{1,2}-\d{1,2}$' THEN
+        RETURN make_date(split_part(value, '-', 1)::INT, split_part(value, '-', 2)::INT, split_part(value, '-', 3)::INT);
+    ELSIF value ~ '^\d{4}-\d{1,2}$' THEN
+        RETURN make_date(split_part(value, '-', 1)::INT, split_part(value, '-', 2)::INT, 1);
+    ELSIF value ~ '^\d{4}$' THEN
+        RETURN make_date(value::INT, 1, 1);
+    ELSIF value ~ '^\d{1,2}\.\d{4}$' THEN
+        RETURN make_date(split_part(value, '.', 2)::INT, split_part(value, '.', 1)::INT, 1);
+    ELSIF value ~ '^\d{1,2}\.\d{1,2}\.\d{4}$' THEN
+        RETURN make_date(split_part(value, '.', 3)::INT, split_part(value, '.', 2)::INT, split_part(value, '.', 1)::INT);
+    END IF;
+    RETURN NULL;
+EXCEPTION WHEN OTHERS THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE RETURNS NULL ON NULL INPUT;
+
+-- Generated columns must be immutable, so open-ended positions (no parseable end_date) are not counted.
+CREATE OR REPLACE FUNCTION resume_experience_years(experience JSONB) RETURNS NUMERIC AS $$
+    SELECT round(coalesce(sum(resume_date(job->>'end_date') - resume_date(job->>'start_date')), 0) / 365.25, 1)
+    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(experience) = 'array' THEN experience ELSE '[]' END) AS job
+    WHERE resume_date(job->>'end_date') >= resume_date(job->>'start_date');
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+CREATE OR REPLACE FUNCTION resume_companies(experience JSONB) RETURNS TEXT[] AS $$
+    SELECT coalesce(array_agg(DISTINCT btrim(job->>'company')), '{}')
+    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(experience) = 'array' THEN experience ELSE '[]' END) AS job
+    WHERE nullif(btrim(job->>'company'), '') IS NOT NULL;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+ALTER TABLE resumes
+    ADD COLUMN experience_years NUMERIC GENERATED ALWAYS AS (resume_experience_years(experience)) STORED,
+    ADD COLUMN companies TEXT[] GENERATED ALWAYS AS (resume_companies(experience)) STORED,
+    ADD COLUMN summary_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', coalesce(summary, ''))) STORED;
+
+CREATE INDEX resumes_skills_gin ON resumes USING GIN (skills);
+CREATE INDEX resumes_languages_gin ON resumes USING GIN (languages);
+CREATE INDEX resumes_certifications_gin ON resumes USING GIN (certifications);
+CREATE INDEX resumes_companies_gin ON resumes USING GIN (companies);
+CREATE INDEX resumes_title_trgm ON resumes USING GIN (title gin_trgm_ops);
+CREATE INDEX resumes_summary_tsv_gin ON resumes USING GIN (summary_tsv);
+CREATE INDEX resumes_experience_years_idx ON resumes (experience_years);
+
+-- Column comments are rendered into the agents' schema prompt.
+COMMENT ON COLUMN resumes.skills IS 'GIN-indexed: filter with skills @> ARRAY[''Python''] or skills && ARRAY[...]';
+COMMENT ON COLUMN resumes.languages IS 'GIN-indexed: filter with languages @> ARRAY[...] or languages && ARRAY[...]';
+COMMENT ON COLUMN resumes.certifications IS 'GIN-indexed: filter with certifications @> ARRAY[...]';
+COMMENT ON COLUMN resumes.title IS 'trigram-indexed: title ILIKE ''%devops%'' is fast';
+COMMENT ON COLUMN resumes.experience_years IS 'generated: total years in completed positions from experience';
+COMMENT ON COLUMN resumes.companies IS 'generated, GIN-indexed: distinct employer names, filter with companies @> ARRAY[...]';
+COMMENT ON COLUMN resumes.summary_tsv IS
+    'generated, GIN-indexed: full-text search over summary, use summary_tsv @@ plainto_tsquery(''russian'', ...)';
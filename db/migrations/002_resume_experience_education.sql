@@ -0,0 +1,111 @@
+-- Normalized work/education history with parsed date ranges, so tenure questions become index lookups.
+
+CREATE TABLE resume_experience (
+    id SERIAL PRIMARY KEY,
+    resume_id INT NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    ordinal INT NOT NULL,
+    company TEXT,
+    job_title TEXT,
+    start_date DATE,
+    end_date DATE,
+    is_current BOOLEAN NOT NULL,
+    duration_months INT
+);
+
+CREATE TABLE resume_education (
+    id SERIAL PRIMARY KEY,
+    resume_id INT NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    ordinal INT NOT NULL,
+    institution TEXT,
+    degree TEXT,
+    details TEXT,
+    start_date DATE,
+    end_date DATE,
+    duration_months INT
+);
+
+CREATE INDEX resume_experience_resume_id_idx ON resume_experience (resume_id);
+CREATE INDEX resume_experience_company_idx ON resume_experience (company, duration_months);
+CREATE INDEX resume_experience_lower_company_idx ON resume_experience (lower(company));
+CREATE INDEX resume_experience_duration_idx ON resume_experience (duration_months);
+CREATE INDEX resume_education_resume_id_idx ON resume_education (resume_id);
+CREATE INDEX resume_education_institution_idx ON resume_education (institution);
+
+CREATE FUNCTION resume_months_between(start_date DATE, end_date DATE) RETURNS INT AS $$
+    SELECT CASE WHEN end_date >= start_date
+        THEN (extract(YEAR FROM age(end_date, start_date)) * 12 + extract(MONTH FROM age(end_date, start_date)))::INT
+    END;
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Rebuilds the side-table rows of the given resumes from their experience/education JSONB.
+CREATE FUNCTION sync_resume_details(resume_ids INT[]) RETURNS VOID AS $$
+    DELETE FROM resume_experience WHERE resume_id = ANY(resume_ids);
+    DELETE FROM resume_education WHERE resume_id = ANY(resume_ids);
+
+    INSERT INTO resume_experience (
+        resume_id, ordinal, company, job_title, start_date, end_date, is_current, duration_months
+    )
+    SELECT
+        r.id,
+        job.ordinality,
+        nullif(btrim(job.value->>'company'), ''),
+        nullif(btrim(job.value->>'job_title'), ''),
+        resume_date(job.value->>'start_date'),
+        resume_date(job.value->>'end_date'),
+        resume_date(job.value->>'end_date') IS NULL,
+        resume_months_between(
+            resume_date(job.value->>'start_date'),
+            coalesce(resume_date(job.value->>'end_date'), current_date)
+        )
+    FROM resumes r
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(r.experience) = 'array' THEN r.experience ELSE '[]' END
+    ) WITH ORDINALITY AS job
+    WHERE r.id = ANY(resume_ids) AND jsonb_typeof(job.value) = 'object';
+
+    INSERT INTO resume_education (
+        resume_id, ordinal, institution, degree, details, start_date, end_date, duration_months
+    )
+    SELECT
+        r.id,
+        edu.ordinality,
+        nullif(btrim(edu.value->>'institution'), ''),
+        nullif(btrim(edu.value->>'degree'), ''),
+        nullif(btrim(edu.value->>'details'), ''),
+        resume_date(edu.value->>'start_date'),
+        resume_date(edu.value->>'end_date'),
+        resume_months_between(resume_date(edu.value->>'start_date'), resume_date(edu.value->>'end_date'))
+    FROM resumes r
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(r.education) = 'array' THEN r.education ELSE '[]' END
+    ) WITH ORDINALITY AS edu
+    WHERE r.id = ANY(resume_ids) AND jsonb_typeof(edu.value) = 'object';
+$$ LANGUAGE sql;
+
+-- Statement-level with transition tables, so bulk inserts resync in one pass instead of once per row.
+CREATE FUNCTION resumes_sync_details() RETURNS trigger AS $$
+BEGIN
+    PERFORM sync_resume_details(ARRAY(SELECT id FROM changed_resumes));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER resumes_sync_details_insert
+AFTER INSERT ON resumes
+REFERENCING NEW TABLE AS changed_resumes
+FOR EACH STATEMENT EXECUTE FUNCTION resumes_sync_details();
+
+CREATE TRIGGER resumes_sync_details_update
+AFTER UPDATE ON resumes
+REFERENCING NEW TABLE AS changed_resumes
+FOR EACH STATEMENT EXECUTE FUNCTION resumes_sync_details();
+
+SELECT sync_resume_details(ARRAY(SELECT id FROM resumes));
+
+COMMENT ON TABLE resume_experience IS 'one row per experience entry of resumes; join on resume_id = resumes.id';
+COMMENT ON COLUMN resume_experience.company IS
+    'B-tree indexed: company = ''X'' or lower(company) = ''x'' (combine with duration_months for tenure)';
+COMMENT ON COLUMN resume_experience.duration_months IS
+    'B-tree indexed: months in the position; for current ones (is_current) counted up to the last resume update';
+COMMENT ON TABLE resume_education IS 'one row per education entry of resumes; join on resume_id = resumes.id';
+COMMENT ON COLUMN resume_education.duration_months IS 'months of study';
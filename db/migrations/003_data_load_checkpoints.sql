@@ -0,0 +1,8 @@
+-- Progress of the bulk JSON loader (db/load_initial_data.py), committed together with each loaded chunk.
+
+CREATE TABLE data_load_checkpoints (
+    source TEXT PRIMARY KEY,
+    last_file TEXT NOT NULL,
+    files_done BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
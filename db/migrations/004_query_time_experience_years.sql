@@ -0,0 +1,54 @@
+-- Total experience is computed at query time: a generated column cannot use current_date, so it left out
+-- current positions, which are exactly the ones that matter for "more than N years" questions.
+
+-- Same formats as before, but every part is range-checked before make_date, so no exception handler (and no
+-- subtransaction per call) is needed.
+CREATE OR REPLACE FUNCTION resume_date(value TEXT) RETURNS DATE AS $$
+DECLARE
+    parts TEXT[];
+    y INT;
+    m INT;
+    d INT := 1;
+BEGIN
+    value := btrim(value);
+    IF value ~ '^\d{4}(-\d{1,2}){0,2}$' THEN
+        parts := string_to_array(value, '-');
+        y := parts[1]::INT;
+        m := coalesce(parts[2]::INT, 1);
+        d := coalesce(parts[3]::INT, 1);
+    ELSIF value ~ '^(\d{1,2}\.){1,2}\d{4}$' THEN
+        parts := string_to_array(value, '.');
+        y := parts[array_length(parts, 1)]::INT;
+        m := parts[array_length(parts, 1) - 1]::INT;
+        IF array_length(parts, 1) = 3 THEN
+            d := parts[1]::INT;
+        END IF;
+    ELSE
+        RETURN NULL;
+    END IF;
+    -- Nested rather than OR-ed: SQL does not promise short-circuit evaluation, and make_date raises on bad parts.
+    IF y < 1 OR m NOT BETWEEN 1 AND 12 OR d < 1 THEN
+        RETURN NULL;
+    END IF;
+    IF d > extract(DAY FROM make_date(y, m, 1) + INTERVAL '1 month - 1 day') THEN
+        RETURN NULL;
+    END IF;
+    RETURN make_date(y, m, d);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE RETURNS NULL ON NULL INPUT;
+
+ALTER TABLE resumes DROP COLUMN experience_years;
+DROP FUNCTION resume_experience_years(JSONB);
+
+CREATE VIEW resume_experience_totals AS
+SELECT
+    resume_id,
+    round(sum(resume_months_between(start_date, coalesce(end_date, current_date))) / 12.0, 1) AS experience_years
+FROM resume_experience
+GROUP BY resume_id;
+
+COMMENT ON VIEW resume_experience_totals IS
+    'total years of experience per resume, current positions counted up to today; join on resume_id = resumes.id';
+COMMENT ON COLUMN resume_experience.duration_months IS
+    'B-tree indexed: months in the position; for current ones (is_current) counted up to the last resume update, '
+    'use resume_experience_totals for totals as of today';
@@ -0,0 +1,17 @@
+-- Replaces the data_versions counter row with a sequence: every write statement updated that single row, so
+-- concurrent writers serialized on its lock until commit. nextval is non-transactional and never waits.
+
+CREATE SEQUENCE IF NOT EXISTS resumes_data_version_seq;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    PERFORM nextval(format('%I_data_version_seq', TG_TABLE_NAME));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER resumes_bump_data_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON resumes
+FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+DROP TABLE IF EXISTS data_versions;
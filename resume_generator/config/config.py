@@ -1,4 +1,5 @@
-from enum import Enum
+import os
+from enum import StrEnum
 from pathlib import Path
 
 from pydantic import Field, SecretStr
@@ -11,9 +12,11 @@ CONFIG_DIR = PROJECT_ROOT / "config"
 CV_DIR = DATA_DIR / "resumes_pdf"
 LATEX_DIR = DATA_DIR / "resumes_latex"
 JSON_DIR = DATA_DIR / "resumes_json"
+LATEX_FORMAT_DIR = DATA_DIR / "latex_format"
+JINJA_CACHE_DIR = DATA_DIR / "jinja_cache"
 
 
-class LogLevel(str, Enum):
+class LogLevel(StrEnum):
     DEBUG = "DEBUG"
     INFO = "INFO"
     WARNING = "WARNING"
@@ -40,7 +43,59 @@ class Settings(BaseSettings):
         default=str(CONFIG_DIR / "resume_template.tex"), description="Path of latex template for resume"
     )
     retry_delay: int = Field(default=15, description="Retry delay of generating single resume")
-    workers_num: int = Field(default=20, description="Number of workers")
+    max_retry_delay: int = Field(default=120, description="Upper bound of the exponential retry delay")
+    workers_num: int = Field(
+        default=20, description="Maximum number of concurrent LLM requests, shared by all bulk generation jobs"
+    )
+    llm_initial_concurrency: int = Field(
+        default=4,
+        alias="CV_GENERATOR_LLM_INITIAL_CONCURRENCY",
+        description="Starting concurrency of LLM requests, adapted between 1 and workers_num",
+    )
+    llm_requests_per_minute: int = Field(
+        default=0, alias="CV_GENERATOR_LLM_REQUESTS_PER_MINUTE", description="LLM requests per minute, 0 disables"
+    )
+    llm_tokens_per_minute: int = Field(
+        default=0, alias="CV_GENERATOR_LLM_TOKENS_PER_MINUTE", description="LLM tokens per minute, 0 disables"
+    )
+    llm_output_tokens_estimate: int = Field(
+        default=2000,
+        alias="CV_GENERATOR_LLM_OUTPUT_TOKENS_ESTIMATE",
+        description="Expected completion tokens per request, charged to the token bucket up front",
+    )
+    llm_timeout: float = Field(
+        default=180, alias="CV_GENERATOR_LLM_TIMEOUT", description="Timeout of a single LLM request in seconds"
+    )
+    llm_retry_budget_ratio: float = Field(
+        default=0.2, alias="CV_GENERATOR_LLM_RETRY_BUDGET_RATIO", description="Allowed retries per LLM request"
+    )
+    llm_retry_budget_reserve: int = Field(
+        default=10,
+        alias="CV_GENERATOR_LLM_RETRY_BUDGET_RESERVE",
+        description="Retries allowed in a burst on top of the retry ratio",
+    )
+    db_batch_size: int = Field(
+        default=100, alias="CV_GENERATOR_DB_BATCH_SIZE", description="Maximum number of resumes per database upsert"
+    )
+    db_flush_interval_ms: int = Field(
+        default=500,
+        alias="CV_GENERATOR_DB_FLUSH_INTERVAL_MS",
+        description="Maximum time a generated resume waits for its batch to be written, in milliseconds",
+    )
+    db_pool_size: int = Field(
+        default=2, alias="CV_GENERATOR_DB_POOL_SIZE", description="Maximum number of pooled database connections"
+    )
+    jobs_history: int = Field(
+        default=100, alias="CV_GENERATOR_JOBS_HISTORY", description="Number of finished generation jobs to keep"
+    )
+    compile_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        alias="CV_GENERATOR_COMPILE_WORKERS",
+        description="Number of concurrent pdflatex jobs, defaults to the number of CPU cores",
+    )
+    compile_timeout: float = Field(
+        default=120, alias="CV_GENERATOR_COMPILE_TIMEOUT", description="Timeout of a single pdflatex run in seconds"
+    )
 
 
 settings = Settings()
@@ -49,3 +104,4 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 CV_DIR.mkdir(parents=True, exist_ok=True)
 LATEX_DIR.mkdir(parents=True, exist_ok=True)
 JSON_DIR.mkdir(parents=True, exist_ok=True)
+JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -1,16 +1,34 @@
 import asyncio
+import functools
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated
 
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import JSONResponse
 
+from resume_generator.config.config import settings
 from resume_generator.src import utils
+from resume_generator.src.jobs import JobManager
 from resume_generator.src.logger import setup_logging
 from resume_generator.src.models import CandidateInput
 
 
 logger = setup_logging()
-app = FastAPI()
+job_manager = JobManager(history=settings.jobs_history)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    utils.latex_compiler.start()
+    utils.db_sink.start()
+    yield
+    await job_manager.close()
+    await utils.db_sink.close()
+    utils.latex_compiler.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 logger.info("Starting the application.")
 
@@ -25,11 +43,42 @@ async def healthcheck() -> dict:
     return {"status": "healthy"}
 
 
+@app.get("/stats", tags=["Health"])
+async def stats() -> dict:
+    return {
+        "llm": utils.llm_client.stats(),
+        "latex_compiler": utils.latex_compiler.stats(),
+        "database": utils.db_sink.stats(),
+        "jobs": job_manager.stats(),
+    }
+
+
 @app.get("/generate_random_resume", tags=["Generation"])
-async def generate_resumes(n: Annotated[int, Query(description="Number of resumes to generate")] = ...) -> dict:
+async def generate_resumes(n: Annotated[int, Query(ge=1, description="Number of resumes to generate")] = ...) -> dict:
     logger.info(f"Received request to generate {n} resumes")
-    asyncio.create_task(utils.generate_random_resume_task(n, logger))  # noqa: RUF006
-    return {"status": "started", "message": f"Generation of {n} resumes started"}
+    job = job_manager.submit(n, functools.partial(utils.generate_random_resume_task, logger=logger))
+    return {"status": "started", "job_id": job.id, "message": f"Generation of {n} resumes started"}
+
+
+@app.get("/jobs", tags=["Generation"])
+async def list_jobs() -> list[dict]:
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@app.get("/jobs/{job_id}", tags=["Generation"])
+async def get_job(job_id: str) -> dict:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}", tags=["Generation"])
+async def cancel_job(job_id: str) -> dict:
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
 
 
 @app.post("/generate_resume", tags=["Generation"])
@@ -44,7 +93,7 @@ async def generate_resume(candidate: CandidateInput) -> dict:
             status_code=500,
             content={"status": "error", "message": f"Ошибка генерации: {e!s}"},
         )
-    utils.insert_resumes_to_db(resume=resume_json, logger=logger)
+    await asyncio.to_thread(utils.insert_resumes_to_db, resume=resume_json, logger=logger)
     return {
         "status": "success",
         "message": f"Резюме успешно сгенерировано для {candidate.name}",
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+import threading
+
+import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+
+from resume_generator.src.jobs import GenerationJob
+
+
+logger = logging.getLogger(__name__)
+
+UPSERT_QUERY = """
+INSERT INTO resumes (
+    name, gender, title, summary, contact_info,
+    skills, experience, education,
+    languages, certifications, hobbies, portfolio
+) VALUES %s
+ON CONFLICT (name) DO UPDATE SET
+    gender = EXCLUDED.gender,
+    title = EXCLUDED.title,
+    summary = EXCLUDED.summary,
+    contact_info = EXCLUDED.contact_info,
+    skills = EXCLUDED.skills,
+    experience = EXCLUDED.experience,
+    education = EXCLUDED.education,
+    languages = EXCLUDED.languages,
+    certifications = EXCLUDED.certifications,
+    hobbies = EXCLUDED.hobbies,
+    portfolio = EXCLUDED.portfolio
+RETURNING name
+"""
+
+
+def resume_to_sql_values(resume: dict) -> tuple:
+    return (
+        resume.get("name"),
+        resume.get("gender"),
+        resume.get("title"),
+        resume.get("summary"),
+        json.dumps(resume.get("contact_info")),
+        resume.get("skills"),
+        json.dumps(resume.get("experience")),
+        json.dumps(resume.get("education")),
+        resume.get("languages"),
+        resume.get("certifications"),
+        resume.get("hobbies"),
+        json.dumps(resume.get("portfolio")),
+    )
+
+
+class ResumeDbSink:
+    """Batched writer of generated resumes into ``resumes``.
+
+    Workers hand resumes to :meth:`put`; a single background task collects them and flushes every
+    ``batch_size`` rows or ``flush_interval`` seconds after the first pending row, whichever comes first, with
+    one multi-row upsert per batch. Connections come from a small pool, created on first use, that the
+    single-resume endpoint shares through :meth:`write`.
+    """
+
+    def __init__(self, db_params: dict, batch_size: int, flush_interval: float, pool_size: int) -> None:
+        self.db_params = db_params
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pool_size = pool_size
+        self._pool: ThreadedConnectionPool | None = None
+        self._pool_lock = threading.Lock()
+        self._queue: asyncio.Queue[tuple[dict, GenerationJob | None] | None] = asyncio.Queue(batch_size * 4)
+        self._task: asyncio.Task | None = None
+        self._flushes = 0
+        self._written = 0
+        self._errors = 0
+
+    def _connection_pool(self) -> ThreadedConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(1, self.pool_size, **self.db_params)
+            return self._pool
+
+    def write(self, resumes: list[dict]) -> set[str]:
+        """Upsert ``resumes`` by name in one transaction and return the names written.
+
+        If the multi-row statement fails, rows are retried one by one under savepoints so a single bad resume
+        does not drop the whole batch. Blocking; call it from a thread.
+        """
+        # ON CONFLICT DO UPDATE cannot touch the same row twice in one statement, so the last copy of a name wins.
+        latest = {resume["name"]: resume for resume in resumes if resume.get("name")}
+        if not latest:
+            return set()
+        pool = self._connection_pool()
+        conn = pool.getconn()
+        broken = False
+        try:
+            with conn.cursor() as cursor:
+                try:
+                    written = self._upsert(cursor, list(latest.values()))
+                except psycopg2.Error:
+                    logger.warning("Batch upsert failed, retrying resumes one by one")
+                    written = set()
+                    for resume in latest.values():
+                        try:
+                            written |= self._upsert(cursor, [resume])
+                        except psycopg2.Error:
+                            logger.exception(f"Error inserting resume {resume['name']}")
+            conn.commit()
+        except psycopg2.Error:
+            broken = conn.closed != 0
+            if not broken:
+                conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn, close=broken)
+        return written
+
+    @staticmethod
+    def _upsert(cursor: psycopg2.extensions.cursor, resumes: list[dict]) -> set[str]:
+        cursor.execute("SAVEPOINT upsert_resumes")
+        try:
+            rows = execute_values(
+                cursor,
+                UPSERT_QUERY,
+                [resume_to_sql_values(resume) for resume in resumes],
+                page_size=len(resumes),
+                fetch=True,
+            )
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT upsert_resumes")
+            raise
+        cursor.execute("RELEASE SAVEPOINT upsert_resumes")
+        return {name for (name,) in rows}
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="resume-db-sink")
+
+    async def put(self, resume: dict, job: GenerationJob | None = None) -> None:
+        """Queue ``resume`` for the next flush; waits while the queue is full. ``job.db_inserted`` counts it."""
+        await self._queue.put((resume, job))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), deadline - loop.time())
+                except TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[dict, GenerationJob | None]]) -> None:
+        # Any error is logged and the batch dropped: if it escaped, the sink task would die, put() would block
+        # forever on the full queue and close() would re-raise it.
+        try:
+            written = await asyncio.to_thread(self.write, [resume for resume, _ in batch])
+        except Exception:
+            logger.exception(f"Failed to write {len(batch)} resumes to the database")
+            self._errors += len(batch)
+            return
+        self._flushes += 1
+        self._written += len(written)
+        self._errors += sum(resume.get("name") not in written for resume, _ in batch)
+        for resume, job in batch:
+            if job is not None and resume.get("name") in written:
+                job.db_inserted += 1
+        logger.info(f"Flushed {len(written)} of {len(batch)} resumes to the database")
+
+    async def close(self) -> None:
+        """Flush everything queued so far, then release the pool."""
+        if self._task is not None:
+            await self._queue.put(None)
+            await self._task
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "flushes": self._flushes,
+            "written": self._written,
+            "errors": self._errors,
+        }
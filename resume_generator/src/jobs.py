@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(StrEnum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+@dataclass
+class GenerationJob:
+    """Progress of one bulk generation request; counters are updated by the workers as resumes pass each stage."""
+
+    total: int
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.RUNNING
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    llm_done: int = 0
+    json_saved: int = 0
+    pdf_compiled: int = 0
+    db_inserted: int = 0
+    failed: int = 0
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def processed(self) -> int:
+        return self.pdf_compiled + self.failed
+
+    def to_dict(self) -> dict:
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        rate = self.pdf_compiled / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.processed, 0)
+        running = self.status is JobStatus.RUNNING
+        return {
+            "job_id": self.id,
+            "status": self.status.value,
+            "error": self.error,
+            "total": self.total,
+            "stages": {
+                "llm_done": self.llm_done,
+                "json_saved": self.json_saved,
+                "pdf_compiled": self.pdf_compiled,
+                "db_inserted": self.db_inserted,
+                "failed": self.failed,
+            },
+            "elapsed_seconds": round(elapsed, 1),
+            "resumes_per_minute": round(rate * 60, 2),
+            "eta_seconds": round(remaining / rate, 1) if running and rate else None,
+        }
+
+
+class JobManager:
+    """Registry of bulk generation jobs; only the ``history`` most recent finished jobs are kept.
+
+    Jobs do not own LLM capacity: their workers all go through the shared LLM client, whose concurrency limit
+    is the global budget, so however many jobs run at once they split it instead of multiplying it.
+    """
+
+    def __init__(self, history: int) -> None:
+        self.history = history
+        self._jobs: dict[str, GenerationJob] = {}
+
+    def submit(self, total: int, run: Callable[[GenerationJob], Awaitable[None]]) -> GenerationJob:
+        job = GenerationJob(total=total)
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, run), name=f"job-{job.id}")
+        job.task.add_done_callback(lambda task: self._settle(job, task))
+        self._prune()
+        return job
+
+    async def _run(self, job: GenerationJob, run: Callable[[GenerationJob], Awaitable[None]]) -> None:
+        try:
+            await run(job)
+            job.status = JobStatus.COMPLETED
+        except asyncio.CancelledError:
+            job.status = JobStatus.CANCELLED
+            logger.info(f"Job {job.id} cancelled")
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            logger.exception(f"Job {job.id} failed")
+        finally:
+            job.finished_at = time.time()
+
+    @staticmethod
+    def _settle(job: GenerationJob, task: asyncio.Task) -> None:
+        # A task cancelled before its first step never enters _run, so nothing else would finish the job.
+        if job.status is JobStatus.RUNNING and task.cancelled():
+            job.status = JobStatus.CANCELLED
+            job.finished_at = time.time()
+            logger.info(f"Job {job.id} cancelled before it started")
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status is not JobStatus.RUNNING]
+        for job in finished[: max(len(finished) - self.history, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> GenerationJob | None:
+        return self._jobs.get(job_id)
+
+    def list(self) -> list[GenerationJob]:
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> GenerationJob | None:
+        job = self._jobs.get(job_id)
+        if job is not None and job.task is not None and job.status is JobStatus.RUNNING:
+            job.task.cancel()
+        return job
+
+    def stats(self) -> dict:
+        running = sum(job.status is JobStatus.RUNNING for job in self._jobs.values())
+        return {"running_jobs": running, "jobs": len(self._jobs)}
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+BEGIN_DOCUMENT = r"\begin{document}"
+
+
+class LatexCompiler:
+    r"""Bounded pool of ``pdflatex`` jobs, each compiled in its own scratch directory.
+
+    At most ``workers`` compilations run at once, the rest wait in the queue. Every job writes its ``.aux``/``.log``
+    files to a private temporary directory and only the finished PDF is moved into ``output_dir``, so concurrent
+    jobs never touch each other's intermediate files and nothing has to be cleaned up afterwards.
+
+    The template preamble (everything before ``\\begin{document}``) is the same for every resume, so it is dumped
+    once into a format file with ``pdflatex -ini`` and mylatexformat; jobs then start from that format instead of
+    loading all packages again. Without ``mylatexformat`` the compiler falls back to the plain ``pdflatex`` format.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        output_dir: Path,
+        format_dir: Path,
+        template_path: Path,
+        timeout: float,
+    ) -> None:
+        self.workers = workers
+        self.output_dir = output_dir
+        self.format_dir = format_dir
+        self.template_path = template_path
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdflatex")
+        self._slots: asyncio.Semaphore | None = None
+        self._format_lock = threading.Lock()
+        self._format_ready = False
+        self._format_name: str | None = None
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+        self._max_queued = 0
+
+    def start(self) -> None:
+        """Build the preamble format in the background so the first request does not pay for it."""
+        self._executor.submit(self._ensure_format)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _env(self) -> dict[str, str]:
+        # The trailing separator keeps the default format search path after our own directory.
+        return {**os.environ, "TEXFORMATS": f"{self.format_dir}{os.pathsep}"}
+
+    def _ensure_format(self) -> str | None:
+        with self._format_lock:
+            if not self._format_ready:
+                self._format_name = self._build_format()
+                self._format_ready = True
+            return self._format_name
+
+    def _build_format(self) -> str | None:
+        """Dump the template preamble into ``<format_dir>/resume_<hash>.fmt``, reusing an existing one.
+
+        The name hashes the preamble and the ``pdflatex`` version, so editing the template or upgrading TeX Live
+        produces a new format instead of loading an incompatible one.
+        """
+        source = self.template_path.read_text(encoding="utf-8")
+        preamble, found, _ = source.partition(BEGIN_DOCUMENT)
+        if not found or "{{" in preamble or "{%" in preamble:
+            logger.warning("Template preamble is not static, compiling without a precompiled format")
+            return None
+
+        try:
+            version = subprocess.run(
+                ["pdflatex", "--version"],  # noqa: S607
+                check=True,
+                capture_output=True,
+                text=True,
+                timeout=self.timeout,
+            ).stdout.partition("\n")[0]
+        except (OSError, subprocess.SubprocessError):
+            logger.exception("pdflatex is not available")
+            return None
+
+        digest = hashlib.sha256(f"{version}\n{preamble}".encode()).hexdigest()[:16]
+        name = f"resume_{digest}"
+        if (self.format_dir / f"{name}.fmt").exists():
+            logger.info(f"Using precompiled LaTeX format {name}")
+            return name
+
+        started = time.monotonic()
+        with tempfile.TemporaryDirectory(prefix="latex-format-") as scratch:
+            preamble_path = Path(scratch) / "preamble.tex"
+            preamble_path.write_text(f"{preamble}{BEGIN_DOCUMENT}\n\\end{{document}}\n", encoding="utf-8")
+            try:
+                subprocess.run(  # noqa: S603
+                    [  # noqa: S607
+                        "pdflatex",
+                        "-ini",
+                        "-interaction=nonstopmode",
+                        f"-jobname={name}",
+                        "&pdflatex",
+                        "mylatexformat.ltx",
+                        str(preamble_path),
+                    ],
+                    cwd=scratch,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    timeout=self.timeout,
+                )
+            except (OSError, subprocess.SubprocessError):
+                logger.warning("Failed to build a LaTeX format, compiling without it", exc_info=True)
+                return None
+            self.format_dir.mkdir(parents=True, exist_ok=True)
+            staged = self.format_dir / f".{name}.fmt.part"
+            shutil.copyfile(Path(scratch) / f"{name}.fmt", staged)
+            staged.replace(self.format_dir / f"{name}.fmt")
+
+        logger.info(f"Built LaTeX format {name} in {time.monotonic() - started:.1f}s")
+        return name
+
+    def _compile(self, tex_path: Path) -> Path:
+        format_name = self._ensure_format()
+        pdf_path = self.output_dir / tex_path.with_suffix(".pdf").name
+        with tempfile.TemporaryDirectory(prefix="latex-job-") as scratch:
+            command = ["pdflatex", "-interaction=nonstopmode", f"-output-directory={scratch}"]
+            if format_name is not None:
+                command.append(f"-fmt={format_name}")
+            subprocess.run(  # noqa: S603
+                [*command, str(tex_path.resolve())],
+                cwd=scratch,
+                env=self._env(),
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=self.timeout,
+            )
+            # Copy under a temporary name first, so readers of output_dir never see a half-written PDF.
+            staged = self.output_dir / f".{pdf_path.name}.part"
+            shutil.copyfile(Path(scratch) / pdf_path.name, staged)
+            staged.replace(pdf_path)
+        return pdf_path
+
+    async def compile(self, tex_path: Path) -> Path:
+        """Compile ``tex_path`` into ``output_dir`` and return the PDF path.
+
+        Raises ``subprocess.CalledProcessError`` or ``subprocess.TimeoutExpired`` if ``pdflatex`` fails.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        waiting = True
+        try:
+            async with self._slots:
+                waiting = False
+                self._queued -= 1
+                self._running += 1
+                started = time.monotonic()
+                try:
+                    loop = asyncio.get_running_loop()
+                    pdf_path = await loop.run_in_executor(self._executor, self._compile, tex_path)
+                except Exception:
+                    self._failed += 1
+                    raise
+                finally:
+                    self._running -= 1
+                    self._busy_seconds += time.monotonic() - started
+        finally:
+            if waiting:
+                self._queued -= 1
+        self._completed += 1
+        return pdf_path
+
+    def stats(self) -> dict:
+        finished = self._completed + self._failed
+        return {
+            "workers": self.workers,
+            "queued": self._queued,
+            "max_queued": self._max_queued,
+            "running": self._running,
+            "completed": self._completed,
+            "failed": self._failed,
+            "avg_compile_seconds": round(self._busy_seconds / finished, 3) if finished else None,
+            "format": self._format_name,
+        }
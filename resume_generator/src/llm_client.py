@@ -0,0 +1,236 @@
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from typing import TypeVar
+
+import openai
+from openai import AsyncOpenAI
+from pydantic import BaseModel, ValidationError
+
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Rough size of a token for budgeting before the real usage is known; Cyrillic text tokenizes densely.
+CHARS_PER_TOKEN = 3
+# Errors meaning the server is overloaded: they shrink the concurrency limit.
+OVERLOAD_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+# Errors meaning the model returned unusable output: worth another attempt, but say nothing about load.
+OUTPUT_ERRORS = (openai.LengthFinishReasonError, openai.ContentFilterFinishReasonError, ValidationError)
+
+
+class LlmRequestError(RuntimeError):
+    """Raised when a request fails after all attempts or once the retry budget is spent."""
+
+
+class TokenBucket:
+    """Token bucket refilled at ``per_minute`` units per minute, holding at most one minute's worth.
+
+    :meth:`acquire` waits until enough units are available; :meth:`adjust` charges or refunds the difference
+    once the real cost is known, so the balance may go negative. ``per_minute <= 0`` disables the bucket.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float) -> None:
+        if not self.enabled:
+            return
+        amount = min(amount, self.capacity)
+        # Waiters are served one at a time, in arrival order.
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+    def adjust(self, amount: float) -> None:
+        if self.enabled:
+            self._refill()
+            self._tokens -= amount
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1 per limit's worth of successes, halved on overload, within ``[minimum, maximum]``.
+
+    Only requests started after the last decrease can shrink the limit again, so a burst of failures from
+    the same overloaded window halves it once instead of collapsing it to ``minimum``.
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started: float, *, success: bool, overloaded: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            if success:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif overloaded and started >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit / 2)
+                self._last_decrease = time.monotonic()
+                logger.warning(f"LLM overloaded, concurrency limit lowered to {int(self.limit)}")
+            self._condition.notify_all()
+
+
+class RetryBudget:
+    """Bounds retries to ``ratio`` of requests, with a reserve of ``reserve`` retries for bursts.
+
+    Every new request deposits ``ratio`` (up to ``reserve``) and every retry withdraws one, so a failing
+    backend cannot turn each request into ``max_attempts`` requests.
+    """
+
+    def __init__(self, ratio: float, reserve: int) -> None:
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = float(reserve)
+
+    def deposit(self) -> None:
+        self.balance = min(self.reserve, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+class LlmClient:
+    """Structured-output LLM client with rate limiting, adaptive concurrency and budgeted retries.
+
+    Requests pass two token buckets (requests and tokens per minute) and an :class:`AdaptiveLimiter` that
+    ramps concurrency up while calls succeed and halves it on 429s, timeouts, connection and 5xx errors.
+    Failed attempts, including empty answers, are retried up to ``max_attempts`` times with full-jitter
+    exponential backoff (honouring ``Retry-After`` up to ``max_retry_delay``) while the shared
+    :class:`RetryBudget` allows it.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        *,
+        max_concurrency: int,
+        initial_concurrency: int,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        output_tokens_estimate: int,
+        max_attempts: int,
+        retry_delay: float,
+        max_retry_delay: float,
+        retry_budget: RetryBudget,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self.output_tokens_estimate = output_tokens_estimate
+        self.max_attempts = max(max_attempts, 1)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.retry_budget = retry_budget
+        self.limiter = AdaptiveLimiter(initial_concurrency, 1, max_concurrency)
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self._counters = dict.fromkeys(
+            ("requests", "succeeded", "retries", "overloaded", "empty", "invalid", "budget_exhausted", "tokens"), 0
+        )
+
+    def _backoff(self, attempt: int, error: Exception | None) -> float:
+        delay = random.uniform(0, min(self.max_retry_delay, self.retry_delay * 2 ** (attempt - 1)))  # noqa: S311
+        if isinstance(error, openai.APIStatusError):
+            # Retry-After is honoured up to max_retry_delay, so a server cannot park a worker indefinitely.
+            with contextlib.suppress(ValueError):
+                delay = max(delay, min(self.max_retry_delay, float(error.response.headers.get("retry-after", 0))))
+        return delay
+
+    async def parse(self, messages: list[dict], response_format: type[ModelT], temperature: float) -> ModelT:
+        """Return the parsed structured answer; raises :class:`LlmRequestError` when all attempts fail."""
+        estimate = sum(len(message["content"]) for message in messages) // CHARS_PER_TOKEN
+        estimate += self.output_tokens_estimate
+        error: Exception | None = None
+        self.retry_budget.deposit()
+        for attempt in range(1, self.max_attempts + 1):
+            if attempt > 1:
+                if not self.retry_budget.withdraw():
+                    self._counters["budget_exhausted"] += 1
+                    msg = "LLM retry budget exhausted"
+                    raise LlmRequestError(msg) from error
+                self._counters["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt - 1, error))
+
+            await self.request_bucket.acquire(1)
+            await self.token_bucket.acquire(estimate)
+            started = await self.limiter.acquire()
+            self._counters["requests"] += 1
+            success = overloaded = False
+            try:
+                completion = await self.client.beta.chat.completions.parse(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    response_format=response_format,
+                )
+                if completion.usage is not None:
+                    self._counters["tokens"] += completion.usage.total_tokens
+                    self.token_bucket.adjust(completion.usage.total_tokens - estimate)
+                parsed = completion.choices[0].message.parsed
+                # An empty answer is a failed attempt: it must not grow the concurrency limit.
+                success = parsed is not None
+            except OVERLOAD_ERRORS as e:
+                overloaded = True
+                self._counters["overloaded"] += 1
+                error = e
+                logger.warning(f"LLM request failed (attempt {attempt}/{self.max_attempts}): {e!r}")
+                continue
+            except OUTPUT_ERRORS as e:
+                self._counters["invalid"] += 1
+                error = e
+                logger.warning(f"LLM returned unusable output (attempt {attempt}/{self.max_attempts}): {e!r}")
+                continue
+            finally:
+                await self.limiter.release(started, success=success, overloaded=overloaded)
+
+            if parsed is None:
+                self._counters["empty"] += 1
+                error = None
+                logger.warning(f"LLM returned an empty answer (attempt {attempt}/{self.max_attempts})")
+                continue
+            self._counters["succeeded"] += 1
+            return parsed
+
+        msg = f"LLM request failed after {self.max_attempts} attempts"
+        raise LlmRequestError(msg) from error
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": int(self.limiter.limit),
+            "in_flight": self.limiter.in_flight,
+            "retry_budget": round(self.retry_budget.balance, 2),
+            **self._counters,
+        }
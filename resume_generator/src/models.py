@@ -1,9 +1,10 @@
+import hashlib
 from typing import Literal
 
 import jinja2
 from pydantic import BaseModel, Field
 
-from resume_generator.config.config import PROJECT_ROOT, Path, settings
+from resume_generator.config.config import JINJA_CACHE_DIR, PROJECT_ROOT, Path, settings
 
 
 class CandidateInput(BaseModel):
@@ -71,6 +72,8 @@ LATEX_ESCAPE_MAP = {
     "~": r"\textasciitilde{}",
     "^": r"\textasciicircum{}",
 }
+# Quotes are dropped and LaTeX specials escaped in a single str.translate pass.
+LATEX_ESCAPE_TABLE = str.maketrans({'"': None, "'": None, **LATEX_ESCAPE_MAP})
 
 JOBS = [
     "AI Engineer",
@@ -141,8 +144,10 @@ jinja_env = jinja2.Environment(
     comment_start_string="<%",
     comment_end_string="%>",
     autoescape=True,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
 )
 latex_template = jinja_env.get_template(Path(settings.latex_template_path).name)
+LATEX_TEMPLATE_DIGEST = hashlib.sha256(Path(settings.latex_template_path).read_bytes()).hexdigest()
 
 with (PROJECT_ROOT / settings.prompt_path).open(mode="r") as prompt:
     PROMPT_STRUCTURE = prompt.read()
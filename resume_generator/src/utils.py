@@ -1,8 +1,8 @@
 import asyncio
+import hashlib
 import json
 import logging
 import random
-import re
 import subprocess
 from collections.abc import AsyncGenerator
 from pathlib import Path
@@ -13,10 +13,25 @@ from openai import AsyncOpenAI
 
 from resume_generator.config import config
 from resume_generator.src import models
+from resume_generator.src.db_sink import ResumeDbSink
+from resume_generator.src.jobs import GenerationJob
+from resume_generator.src.latex_compiler import LatexCompiler
+from resume_generator.src.llm_client import LlmClient, LlmRequestError, RetryBudget
 
 
 fake = Faker(locale="ru_RU")
 
+# First line of every rendered .tex file, followed by resume_digest() of its content.
+CONTENT_HASH_MARKER = "% content-hash: "
+
+latex_compiler = LatexCompiler(
+    workers=config.settings.compile_workers,
+    output_dir=config.CV_DIR,
+    format_dir=config.LATEX_FORMAT_DIR,
+    template_path=Path(config.settings.latex_template_path),
+    timeout=config.settings.compile_timeout,
+)
+
 
 db_params = {
     "host": config.settings.postgres_host,
@@ -26,14 +41,37 @@ db_params = {
     "password": config.settings.postgres_password.get_secret_value(),
 }
 
+llm_client = LlmClient(
+    AsyncOpenAI(
+        base_url=config.settings.llm_api_url,
+        api_key=config.settings.llm_api_token.get_secret_value(),
+        timeout=config.settings.llm_timeout,
+        max_retries=0,
+    ),
+    config.settings.llm_api_model,
+    max_concurrency=config.settings.workers_num,
+    initial_concurrency=config.settings.llm_initial_concurrency,
+    requests_per_minute=config.settings.llm_requests_per_minute,
+    tokens_per_minute=config.settings.llm_tokens_per_minute,
+    output_tokens_estimate=config.settings.llm_output_tokens_estimate,
+    max_attempts=config.settings.max_retries,
+    retry_delay=config.settings.retry_delay,
+    max_retry_delay=config.settings.max_retry_delay,
+    retry_budget=RetryBudget(config.settings.llm_retry_budget_ratio, config.settings.llm_retry_budget_reserve),
+)
+
+db_sink = ResumeDbSink(
+    db_params,
+    batch_size=config.settings.db_batch_size,
+    flush_interval=config.settings.db_flush_interval_ms / 1000,
+    pool_size=config.settings.db_pool_size,
+)
+
 
 def escape_string(text: str | None) -> str | None:
     if not text:
         return text
-    text = re.sub(r"[\"']", "", text)
-    for char, replacement in models.LATEX_ESCAPE_MAP.items():
-        text = text.replace(char, replacement)
-    return text
+    return text.translate(models.LATEX_ESCAPE_TABLE)
 
 
 def escape_all_strings(obj: any) -> any:
@@ -48,6 +86,40 @@ def escape_all_strings(obj: any) -> any:
     return obj
 
 
+def resume_digest(resume: models.Resume) -> str:
+    """Hash of the resume content together with the LaTeX template it is rendered with."""
+    payload = f"{models.LATEX_TEMPLATE_DIGEST}\n{resume.model_dump_json()}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def artifacts_up_to_date(tex_path: Path, pdf_path: Path, digest: str) -> bool:
+    """Whether ``tex_path`` was rendered from content with ``digest`` and ``pdf_path`` was compiled after it."""
+    try:
+        with tex_path.open(encoding="utf-8") as f:
+            header = f.readline().rstrip("\n")
+        return header == f"{CONTENT_HASH_MARKER}{digest}" and pdf_path.stat().st_mtime >= tex_path.stat().st_mtime
+    except OSError:
+        return False
+
+
+async def render_resume_pdf(resume: models.Resume, stem: str) -> tuple[Path, bool]:
+    """Render ``resume`` to ``LATEX_DIR/<stem>.tex`` and compile it to ``CV_DIR/<stem>.pdf``.
+
+    The content hash is written as the first line of the ``.tex`` file; if it matches and the PDF is newer, both
+    artifacts are reused as is. Returns the PDF path and whether it was reused.
+    """
+    tex_path = config.LATEX_DIR / f"{stem}.tex"
+    pdf_path = config.CV_DIR / f"{stem}.pdf"
+    digest = resume_digest(resume)
+    if await asyncio.to_thread(artifacts_up_to_date, tex_path, pdf_path, digest):
+        return pdf_path, True
+
+    output = models.latex_template.render(escape_all_strings(resume))
+    await asyncio.to_thread(tex_path.write_text, f"{CONTENT_HASH_MARKER}{digest}\n{output}", encoding="utf-8")
+    await latex_compiler.compile(tex_path)
+    return pdf_path, False
+
+
 async def generate_random_resumes(limit: int) -> AsyncGenerator[dict]:
     count = 0
     while count < limit:
@@ -78,114 +150,82 @@ def save_resume_to_json(resume: models.Resume) -> Path:
     return path
 
 
-def clean_cv_folder(cv_dir: Path = config.CV_DIR) -> None:
-    for file in cv_dir.iterdir():
-        if file.suffix != ".pdf":
-            file.unlink()
-
-
-async def compile_latex(latex_file_path: Path) -> None:
-    await asyncio.to_thread(
-        subprocess.run,
-        [
-            "pdflatex",
-            "-interaction=nonstopmode",
-            f"-output-directory={config.CV_DIR}",
-            str(latex_file_path),
-        ],
-        check=True,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
-
-
 async def generate_and_save_resume(
-    llm_api_client: AsyncOpenAI,
     logger: logging.Logger,
     queue: asyncio.Queue,
+    job: GenerationJob,
 ) -> None:
     while True:
-        retry_delay = config.settings.retry_delay
         prompt = await queue.get()
         if prompt is None:
             queue.task_done()
             break
         task_name = asyncio.current_task().get_name()
-        retries = 0
-        while retries < config.settings.max_retries:
-            try:
-                logger.debug(f"[PROMPT] {prompt}")
-                completion = await llm_api_client.beta.chat.completions.parse(
-                    model=config.settings.llm_api_model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "Твоя задача создать структурированный вывод согласно заданной схеме.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=0.15,
-                    response_format=models.Resume,
-                )
-                response = completion.choices[0].message.parsed
-
-                if not response:
-                    logger.warning(f"[{task_name}] Received empty answer for prompt: {prompt}")
-                    continue
-
-                logger.info(f"[{task_name}] Response received")
-
-                json_path = save_resume_to_json(response)
-                logger.info(f"[{task_name}] JSON saved: {json_path}")
-
-                resume = escape_all_strings(response)
-                tex_path = config.LATEX_DIR / f"{Path(json_path).stem}.tex"
-                pdf_path = config.CV_DIR / tex_path.with_suffix(".pdf").name
-
-                output = models.latex_template.render(resume)
-                await asyncio.to_thread(tex_path.write_text, output, encoding="utf-8")
-                logger.info(f"[{task_name}] LaTeX saved: {tex_path}")
-
-                await compile_latex(tex_path)
+        try:
+            logger.debug(f"[PROMPT] {prompt}")
+            response = await llm_client.parse(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Твоя задача создать структурированный вывод согласно заданной схеме.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                response_format=models.Resume,
+                temperature=0.15,
+            )
+            logger.info(f"[{task_name}] Response received")
+            job.llm_done += 1
+
+            json_path = save_resume_to_json(response)
+            logger.info(f"[{task_name}] JSON saved: {json_path}")
+            job.json_saved += 1
+            await db_sink.put(response.model_dump(), job)
+
+            pdf_path, reused = await render_resume_pdf(response, json_path.stem)
+            if reused:
+                logger.info(f"[{task_name}] Resume unchanged, reusing PDF: {pdf_path}")
+            else:
                 logger.info(f"[{task_name}] PDF compiled: {pdf_path}")
-                break
-
-            except subprocess.CalledProcessError:
-                logger.exception(f"[{task_name}] LaTeX compilation error")
-            except Exception as e:
-                logger.exception(f"[{task_name}] Generating resume error", exc_info=e)
-                await asyncio.sleep(retry_delay)
-                retry_delay = min(retry_delay * 2, config.settings.max_retry_delay)
-                retries += 1
-
-        if retries >= config.settings.max_retries:
-            logger.error(f"[{task_name}] Max retries reached. Skipping this generation.")
+            job.pdf_compiled += 1
+
+        except LlmRequestError:
+            logger.exception(f"[{task_name}] Max retries reached. Skipping this generation.")
+            job.failed += 1
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            logger.exception(f"[{task_name}] LaTeX compilation error")
+            job.failed += 1
+        except Exception as e:
+            logger.exception(f"[{task_name}] Generating resume error", exc_info=e)
+            job.failed += 1
+        finally:
+            queue.task_done()
 
-        queue.task_done()
 
+async def generate_random_resume_task(job: GenerationJob, logger: logging.Logger) -> None:
+    """Generate ``job.total`` random resumes, reporting progress on ``job``.
 
-async def generate_random_resume_task(
-    n: int,
-    logger: logging.Logger,
-) -> None:
-    logger.info(f"Received request to generate {n} resumes")
+    All jobs share ``llm_client``, whose adaptive concurrency limit (at most ``workers_num``) is the global
+    budget of LLM requests; the number of workers only bounds this job's share of it. Cancelling the task
+    cancels all of its workers.
+    """
+    n = job.total
+    logger.info(f"Job {job.id}: generating {n} resumes")
     logger.info(f"LLM API URL {config.settings.llm_api_url}")
-    llm_api_client = AsyncOpenAI(
-        base_url=config.settings.llm_api_url, api_key=config.settings.llm_api_token.get_secret_value()
-    )
-    queue = asyncio.Queue(config.settings.workers_num * 2)
+    workers_num = min(config.settings.workers_num, n)
+    queue = asyncio.Queue(workers_num * 2)
 
     workers = [
         asyncio.create_task(
             generate_and_save_resume(
-                llm_api_client=llm_api_client,
                 queue=queue,
                 logger=logger,
+                job=job,
             )
         )
-        for _ in range(config.settings.workers_num)
+        for _ in range(workers_num)
     ]
-    logger.info(f"Spawning {config.settings.workers_num} workers")
+    logger.info(f"Job {job.id}: spawning {workers_num} workers")
 
     async def enqueue_prompts() -> None:
         async for prompt in prompts_generator(generate_random_resumes(n)):
@@ -193,19 +233,22 @@ async def generate_random_resume_task(
         for _ in workers:
             await queue.put(None)
 
-    await enqueue_prompts()
-    await queue.join()
-    await asyncio.gather(*workers)
-
-    clean_cv_folder()
-    logger.info("Temp files cleaned")
+    try:
+        await enqueue_prompts()
+        await queue.join()
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+    logger.info(
+        f"Job {job.id}: generation of {n} resumes finished, LLM: {llm_client.stats()}, "
+        f"LaTeX compiler: {latex_compiler.stats()}, database: {db_sink.stats()}"
+    )
 
 
-async def generate_resume(logger: logging.Logger, candidate_data: dict) -> str | None:
+async def generate_resume(logger: logging.Logger, candidate_data: dict) -> tuple[str, dict]:
     logger.info("Starting resume generation")
-    llm_api_client = AsyncOpenAI(
-        base_url=config.settings.llm_api_url, api_key=config.settings.llm_api_token.get_secret_value()
-    )
     candidate = json.dumps(candidate_data, ensure_ascii=False)
 
     prompt = f"""
@@ -214,39 +257,28 @@ async def generate_resume(logger: logging.Logger, candidate_data: dict) -> str |
 
     logger.debug(f"[PROMPT] {prompt}")
 
-    try:
-        completion = await llm_api_client.beta.chat.completions.parse(
-            model=config.settings.llm_api_model,
-            messages=[
-                {"role": "system", "content": "Твоя задача — создать структурированный вывод согласно заданной схеме."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.15,
-            response_format=models.Resume,
-        )
-        response = completion.choices[0].message.parsed
-
-        if not response:
-            logger.warning("Received empty response")
-            return None
-
-        logger.info("Response received from LLM")
-
-        json_path = save_resume_to_json(response)
-        logger.info(f"Saved resume JSON: {json_path}")
-
-        resume = escape_all_strings(response)
-        tex_path = config.LATEX_DIR / f"{json_path.stem}.tex"
-        pdf_path = config.CV_DIR / tex_path.with_suffix(".pdf").name
+    response = await llm_client.parse(
+        messages=[
+            {"role": "system", "content": "Твоя задача — создать структурированный вывод согласно заданной схеме."},
+            {"role": "user", "content": prompt},
+        ],
+        response_format=models.Resume,
+        temperature=0.15,
+    )
+    logger.info("Response received from LLM")
 
-        tex_output = models.latex_template.render(resume)
-        await asyncio.to_thread(tex_path.write_text, tex_output, encoding="utf-8")
-        logger.info(f"LaTeX file saved: {tex_path}")
+    json_path = save_resume_to_json(response)
+    logger.info(f"Saved resume JSON: {json_path}")
+    pdf_path = config.CV_DIR / f"{json_path.stem}.pdf"
 
-        await compile_latex(tex_path)
-        logger.info(f"PDF compiled: {pdf_path}")
+    try:
+        pdf_path, reused = await render_resume_pdf(response, json_path.stem)
+        if reused:
+            logger.info(f"Resume unchanged, reusing PDF: {pdf_path}")
+        else:
+            logger.info(f"PDF compiled: {pdf_path}")
 
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
         logger.exception("LaTeX compilation error")
     except Exception as e:
         logger.exception("Error generating resume", exc_info=e)
@@ -254,39 +286,9 @@ async def generate_resume(logger: logging.Logger, candidate_data: dict) -> str |
     return pdf_path.name, response.model_dump()
 
 
-def resume_to_sql_values(resume: dict) -> tuple:
-    return (
-        resume.get("name"),
-        resume.get("gender"),
-        resume.get("title"),
-        resume.get("summary"),
-        json.dumps(resume.get("contact_info")),
-        resume.get("skills"),
-        json.dumps(resume.get("experience")),
-        json.dumps(resume.get("education")),
-        resume.get("languages"),
-        resume.get("certifications"),
-        resume.get("hobbies"),
-        json.dumps(resume.get("portfolio")),
-    )
-
-
 def insert_resumes_to_db(resume: dict, logger: logging.Logger) -> None:
-    insert_query = """
-    INSERT INTO resumes (
-        name, gender, title, summary, contact_info,
-        skills, experience, education,
-        languages, certifications, hobbies, portfolio
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
     try:
-        with psycopg2.connect(**db_params) as conn, conn.cursor() as cursor:
-            try:
-                cursor.execute(insert_query, resume_to_sql_values(resume))
-                logger.info(f"Resume for '{resume.get('name')}' inserted into database successfully.")
-            except Exception:
-                conn.rollback()
-                logger.exception(f"Error inserting resume {resume.name}")
-            conn.commit()
-    except Exception:
-        logger.exception("Failed to connect to the database")
+        if db_sink.write([resume]):
+            logger.info(f"Resume for '{resume.get('name')}' inserted into database successfully.")
+    except psycopg2.Error:
+        logger.exception(f"Failed to write resume for '{resume.get('name')}' to the database")
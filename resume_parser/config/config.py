@@ -1,3 +1,4 @@
+import os
 from enum import Enum
 from pathlib import Path
 
@@ -32,6 +33,35 @@ class Settings(BaseSettings):
         default=str(PROJECT_ROOT / "resume_parser/config/resume_parser_prompt.txt"), description="Path of txt prompt"
     )
     allowed_min_len_resume: int = Field(default=100, description="Minimal allowed length of resume text in symbols")
+    max_concurrency: int = Field(
+        default=8, alias="RESUME_PARSER_MAX_CONCURRENCY", description="Maximum number of concurrent LLM parsing calls"
+    )
+    extract_workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        alias="RESUME_PARSER_EXTRACT_WORKERS",
+        description="Process pool size for PDF text extraction, defaults to the number of CPU cores",
+    )
+    file_timeout: float = Field(
+        default=180, alias="RESUME_PARSER_FILE_TIMEOUT", description="Per-file parsing timeout in seconds"
+    )
+    max_upload_bytes: int = Field(
+        default=10 * 1024 * 1024, alias="RESUME_PARSER_MAX_UPLOAD_BYTES", description="Maximum PDF upload size in bytes"
+    )
+    max_prompt_chars: int = Field(
+        default=8000, alias="RESUME_PARSER_MAX_PROMPT_CHARS", description="Resume text budget of the LLM prompt"
+    )
+    max_pages: int = Field(default=20, alias="RESUME_PARSER_MAX_PAGES", description="Maximum number of pages in a PDF")
+    cache_path: Path = Field(
+        default=Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "resume_parser" / "parse_cache.sqlite3",
+        alias="RESUME_PARSER_CACHE_PATH",
+        description="SQLite file of the parsed resume cache",
+    )
+    cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024, alias="RESUME_PARSER_CACHE_MAX_BYTES", description="Parsed resume cache size limit"
+    )
+    db_batch_size: int = Field(
+        default=50, alias="RESUME_PARSER_DB_BATCH_SIZE", description="Parsed resumes written per upsert statement"
+    )
 
 
 settings = Settings()
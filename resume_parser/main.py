@@ -1,17 +1,27 @@
-import tempfile
-from pathlib import Path
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Annotated
 
 from fastapi import FastAPI, File, HTTPException, UploadFile
 
+from resume_parser.config.config import settings
 from resume_parser.src.logger import setup_logging
-from resume_parser.src.resume_parser import ResumeParser
+from resume_parser.src.resume_parser import PdfRejectedError, ResumeParser
 from resume_parser.src.utils import insert_resumes_to_db
 
 
 logger = setup_logging()
 parser = ResumeParser(logger)
-app = FastAPI()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    parser.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 logger.info("Starting the application.")
 
@@ -26,27 +36,62 @@ async def healthcheck() -> dict:
     return {"status": "healthy"}
 
 
+async def _read_upload(file: UploadFile) -> bytes:
+    """Read an upload into memory, rejecting it past ``RESUME_PARSER_MAX_UPLOAD_BYTES``; the upload is always closed.
+
+    Nothing is written to disk by the service: the bytes go straight to PyMuPDF, and closing the upload releases
+    Starlette's spooled buffer as soon as it has been read instead of at the end of the request.
+    """
+    too_large = f"Файл {file.filename} больше {settings.max_upload_bytes} байт"
+    try:
+        if file.size is not None and file.size > settings.max_upload_bytes:
+            raise PdfRejectedError(too_large, status_code=413)
+        data = await file.read(settings.max_upload_bytes + 1)
+        if len(data) > settings.max_upload_bytes:
+            raise PdfRejectedError(too_large, status_code=413)
+        return data
+    finally:
+        await file.close()
+
+
+async def _parse_upload(file: UploadFile) -> dict:
+    """Parse one upload straight from memory within the per-file timeout; cache hits are marked ``cached``.
+
+    Cache hits are still written to the database: the upsert is idempotent, and the row may be missing if the
+    first write failed or the database was reset since.
+    """
+    parsed = await parser.parse_resume_with_timeout(await _read_upload(file), file.filename)
+    return {**parsed.resume.model_dump(), "cached": parsed.cached}
+
+
+async def _write_resumes(parsed_models: list[dict]) -> None:
+    """Upsert parsed resumes in ``RESUME_PARSER_DB_BATCH_SIZE`` chunks off the event loop, attaching DB statuses."""
+    for offset in range(0, len(parsed_models), settings.db_batch_size):
+        chunk = parsed_models[offset : offset + settings.db_batch_size]
+        statuses = await asyncio.to_thread(insert_resumes_to_db, chunk, logger)
+        for parsed_resume, status in zip(chunk, statuses, strict=True):
+            parsed_resume["db_status"] = status["status"]
+            if status["status"] == "error":
+                parsed_resume["db_error"] = status.get("error")
+
+
+@app.get("/stats", tags=["Health"])
+async def stats() -> dict:
+    return {"parse_cache": await asyncio.to_thread(parser.cache.stats)}
+
+
 @app.post("/parse_resume", tags=["Parsing"])
 async def parse_resume(file: Annotated[UploadFile, File()] = ...) -> dict:
     logger.info(f"Получен файл: {file.filename}")
 
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(await file.read())
-            tmp_path = tmp.name
-
-        parsed_data = await parser.parse_resume(tmp_path)
-        parsed_resume = parsed_data.model_dump()
-        insert_resumes_to_db([parsed_resume], logger)
-
+        parsed_resume = await _parse_upload(file)
+        await _write_resumes([parsed_resume])
+    except PdfRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e)) from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
-    finally:
-        # If an error occurred, delete the temporary file
-        if parsed_resume == {} and Path(tmp_path).exists():
-            Path(tmp_path).unlink()
-
     return parsed_resume
 
 
@@ -54,33 +99,24 @@ async def parse_resume(file: Annotated[UploadFile, File()] = ...) -> dict:
 async def parse_resumes_batch(files: Annotated[list[UploadFile], File()] = ...) -> dict:
     logger.info(f"Получено файлов: {[file.filename for file in files]}")
 
+    # Files are parsed concurrently: extraction runs in the parser's worker pool and LLM calls are bounded by its
+    # semaphore, so the batch takes roughly as long as its slowest files rather than the sum of all of them.
+    results = await asyncio.gather(*(_parse_upload(file) for file in files), return_exceptions=True)
+
     parsed_models = []
     response_payload = []
     has_error = False
-
-    for file in files:
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                tmp.write(await file.read())
-                tmp_path = tmp.name
-
-            parsed_data = await parser.parse_resume(tmp_path)
-            parsed_resume = parsed_data.model_dump()
-            parsed_models.append(parsed_resume)
-            response_payload.append(parsed_resume.model_dump())
-
-        except Exception as e:
-            logger.exception(f"Ошибка при обработке файла: {file.filename}")
+    for file, result in zip(files, results, strict=True):
+        if isinstance(result, BaseException):
+            logger.error(f"Ошибка при обработке файла {file.filename}: {result!r}")
             has_error = True
-            response_payload.append({"filename": file.filename, "error": str(e)})
-
-        finally:
-            # If an error occurred, delete the temporary file
-            if parsed_resume == {} and Path(tmp_path).exists():
-                Path(tmp_path).unlink()
+            response_payload.append({"filename": file.filename, "error": str(result)})
+        else:
+            parsed_models.append(result)
+            response_payload.append(result)
 
-    if parsed_models:
-        insert_resumes_to_db(parsed_models, logger)
+    await _write_resumes(parsed_models)
+    has_error = has_error or any(parsed_resume["db_status"] == "error" for parsed_resume in parsed_models)
 
     if has_error:
         raise HTTPException(status_code=500, detail={"results": response_payload})
@@ -0,0 +1,220 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from pydantic import BaseModel, create_model
+
+from resume_parser.src.models import Contacts, Resume
+
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}", re.IGNORECASE)
+PHONE_PATTERN = re.compile(r"(?:\+\d{1,3}|\b8)[\s-]?\(?\d{3}\)?[\s-]?\d{3}[\s-]?\d{2}[\s-]?\d{2}\b")
+LINKEDIN_PATTERN = re.compile(r"(?:https?://)?(?:[\w-]+\.)?linkedin\.com/in/[\w%.-]+", re.IGNORECASE)
+GITHUB_PATTERN = re.compile(r"(?:https?://)?(?:www\.)?github\.com/[\w-]+", re.IGNORECASE)
+
+# Item separators outside parentheses, so "CI/CD (Jenkins, GitLab CI)" stays one item.
+LIST_SEPARATOR_PATTERN = re.compile(r"[,;•|](?![^()]*\))")
+LIST_LABEL_PATTERN = re.compile(r"^[^:]{1,30}:\s*")
+MAX_LIST_ITEM_CHARS = 60
+MAX_LIST_ITEM_WORDS = 4
+# Items starting with these words are phrases ("Опыт работы ...") rather than skills.
+NOISE_PREFIXES = ("опыт", "знание", "умение", "навык", "experience", "knowledge", "ability")
+# A list with a larger share of rejected items is left to the LLM altogether.
+MAX_NOISY_SHARE = 0.25
+
+MONTHS = {
+    "янв": 1, "фев": 2, "мар": 3, "апр": 4, "май": 5, "мая": 5, "июн": 6,
+    "июл": 7, "авг": 8, "сен": 9, "окт": 10, "ноя": 11, "дек": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}  # fmt: skip
+_DATE = (
+    r"\d{4}-\d{1,2}-\d{1,2}(?!\d)|\d{4}-\d{1,2}(?!\d)|\d{1,2}\.\d{1,2}\.\d{4}|\d{1,2}\.\d{4}"
+    r"|[a-zа-яё]{3,9}\.?\s+\d{4}|\d{4}"
+)
+_PRESENT = r"по\s+настоящее\s+время|настоящее\s+время|по\s+н\.?\s*в\.?|н\.?\s*в\.?|сейчас|present|current|now"
+DATE_RANGE_PATTERN = re.compile(rf"({_DATE})\s*[-–—]\s*({_DATE}|{_PRESENT})", re.IGNORECASE)
+
+# Section of the rendered resume text -> Resume list field filled from it.
+LIST_SECTIONS = {"skills": "skills", "languages": "languages"}
+# Section -> (Resume field whose entries get dates from it, entry fields that identify an entry in the text).
+DATED_SECTIONS = {
+    "experience": ("experience", ("company", "job_title")),
+    "education": ("education", ("institution",)),
+}
+# Lines on each side of a date range searched for the company/institution it belongs to.
+CONTEXT_LINES = 2
+MIN_KEY_CHARS = 3
+
+
+@dataclass(frozen=True)
+class DateRange:
+    start: str
+    end: str | None
+    # Casefolded lines around the range, nearest first: its own line, then the ones above and below.
+    context: tuple[str, ...]
+
+
+@dataclass
+class FastPathFacts:
+    """Resume fields extracted deterministically from the text, before and instead of the LLM."""
+
+    contacts: dict[str, str] = field(default_factory=dict)
+    lists: dict[str, list[str]] = field(default_factory=dict)
+    date_ranges: dict[str, list[DateRange]] = field(default_factory=dict)
+
+    @property
+    def contacts_known(self) -> bool:
+        return "email" in self.contacts and "phone" in self.contacts
+
+    @property
+    def omitted_fields(self) -> frozenset[str]:
+        return frozenset(self.lists)
+
+
+def normalize_date(value: str) -> str | None:
+    """Normalize a matched date to ``YYYY``, ``YYYY-MM`` or ``YYYY-MM-DD``; ``None`` for "present"."""
+    value = value.strip().casefold()
+    if re.fullmatch(_PRESENT, value):
+        return None
+    if match := re.fullmatch(r"(\d{4})-(\d{1,2})(?:-(\d{1,2}))?", value):
+        year, month, day = match.groups()
+        return f"{year}-{int(month):02d}" + (f"-{int(day):02d}" if day else "")
+    if match := re.fullmatch(r"(?:(\d{1,2})\.)?(\d{1,2})\.(\d{4})", value):
+        day, month, year = match.groups()
+        return f"{year}-{int(month):02d}" + (f"-{int(day):02d}" if day else "")
+    if match := re.fullmatch(r"([a-zа-яё]{3,9})\.?\s+(\d{4})", value):
+        month = MONTHS.get(match.group(1)[:3])
+        return f"{match.group(2)}-{month:02d}" if month else match.group(2)
+    return value
+
+
+def extract_contacts(text: str) -> dict[str, str]:
+    contacts = {}
+    for key, pattern in (
+        ("email", EMAIL_PATTERN),
+        ("phone", PHONE_PATTERN),
+        ("linkedin", LINKEDIN_PATTERN),
+        ("github", GITHUB_PATTERN),
+    ):
+        if match := pattern.search(text):
+            contacts[key] = re.sub(r"^https?://(?:www\.)?", "", match.group(0))
+    return contacts
+
+
+def _is_list_item(item: str) -> bool:
+    words = item.casefold().split()
+    return len(item) <= MAX_LIST_ITEM_CHARS and len(words) <= MAX_LIST_ITEM_WORDS and words[0] not in NOISE_PREFIXES
+
+
+def split_list(lines: list[str]) -> tuple[list[str], int]:
+    """Split a skills-like section into items, dropping group labels ("Backend: ...").
+
+    Sentence-like items ("Опыт работы ...", anything too long) are rejected; returns the items and the number
+    of rejected ones.
+    """
+    items, rejected = [], 0
+    for line in lines:
+        for raw_item in LIST_SEPARATOR_PATTERN.split(LIST_LABEL_PATTERN.sub("", line)):
+            item = raw_item.strip(" -*·\t")
+            if not item or item in items:
+                continue
+            if _is_list_item(item):
+                items.append(item)
+            else:
+                rejected += 1
+    return items, rejected
+
+
+def extract_date_ranges(lines: list[str]) -> list[DateRange]:
+    folded = [line.casefold() for line in lines]
+    ranges = []
+    for index, line in enumerate(lines):
+        for match in DATE_RANGE_PATTERN.finditer(line):
+            start = normalize_date(match.group(1))
+            if start is None:
+                continue
+            context = [folded[index]]
+            for distance in range(1, CONTEXT_LINES + 1):
+                context.extend(folded[i] for i in (index - distance, index + distance) if 0 <= i < len(lines))
+            ranges.append(DateRange(start, normalize_date(match.group(2)), tuple(context)))
+    return ranges
+
+
+def extract_facts(text: str, sections: dict[str, list[str]]) -> FastPathFacts:
+    facts = FastPathFacts(contacts=extract_contacts(text))
+    for section, resume_field in LIST_SECTIONS.items():
+        items, rejected = split_list(sections.get(section, []))
+        if items and rejected <= MAX_NOISY_SHARE * (len(items) + rejected):
+            facts.lists[resume_field] = items
+    for section, (resume_field, _) in DATED_SECTIONS.items():
+        if ranges := extract_date_ranges(sections.get(section, [])):
+            facts.date_ranges[resume_field] = ranges
+    return facts
+
+
+@lru_cache
+def llm_schema(omitted: frozenset[str], *, contacts_known: bool) -> type[BaseModel]:
+    """Build the reduced structured-output schema: ``Resume`` without the fields the fast path already filled.
+
+    With email and phone known, ``contact_info`` collapses to its only remaining required field, ``location``.
+    """
+    fields = {}
+    for name, field_info in Resume.model_fields.items():
+        if name in omitted:
+            continue
+        if name == "contact_info" and contacts_known:
+            fields["location"] = (str, Contacts.model_fields["location"])
+        else:
+            fields[name] = (field_info.annotation, field_info)
+    return create_model("ResumeDraft", **fields)
+
+
+def merge_facts(draft: BaseModel, facts: FastPathFacts) -> Resume:
+    """Combine the LLM draft with the fast-path facts; deterministic values win over the LLM's."""
+    data = draft.model_dump(exclude_unset=True)
+    if facts.contacts_known:
+        data["contact_info"] = {**facts.contacts, "location": data.pop("location")}
+    else:
+        data["contact_info"] = {**data.get("contact_info", {}), **facts.contacts}
+    data.update(facts.lists)
+
+    for resume_field, key_fields in DATED_SECTIONS.values():
+        entries = data.get(resume_field) or []
+        for index, date_range in _assign_ranges(entries, facts.date_ranges.get(resume_field, []), key_fields).items():
+            entries[index]["start_date"] = _reconcile_date(entries[index].get("start_date"), date_range.start)
+            entries[index]["end_date"] = _reconcile_date(entries[index].get("end_date"), date_range.end)
+    return Resume.model_validate(data)
+
+
+def _assign_ranges(entries: list[dict], ranges: list[DateRange], key_fields: tuple[str, ...]) -> dict[int, DateRange]:
+    """Pair date ranges with the entries whose company/title/institution appears closest to them in the text.
+
+    A range goes to the single entry named nearest to it; ties are skipped. Entries that end up with no range
+    or with several keep the LLM's dates, so order in the text never matters and ambiguity never overwrites.
+    """
+    keys = [
+        [value.casefold() for key in key_fields if len(value := entry.get(key) or "") >= MIN_KEY_CHARS]
+        for entry in entries
+    ]
+    assigned: dict[int, list[DateRange]] = {}
+    for date_range in ranges:
+        scores = sorted(
+            (rank, index)
+            for index, entry_keys in enumerate(keys)
+            if (rank := _nearest(date_range.context, entry_keys)) is not None
+        )
+        if scores and (len(scores) == 1 or scores[0][0] < scores[1][0]):
+            assigned.setdefault(scores[0][1], []).append(date_range)
+    return {index: matched[0] for index, matched in assigned.items() if len(matched) == 1}
+
+
+def _nearest(context: tuple[str, ...], keys: list[str]) -> int | None:
+    return next((rank for rank, line in enumerate(context) if any(key in line for key in keys)), None)
+
+
+def _reconcile_date(llm_value: str | None, matched: str | None) -> str | None:
+    """Keep the LLM's date when it agrees with the matched one (it may be more precise), otherwise use the match."""
+    if matched is not None and llm_value and llm_value.startswith(matched):
+        return llm_value
+    return matched
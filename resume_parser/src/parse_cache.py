@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+
+def pdf_key(data: bytes) -> str:
+    return "pdf:" + hashlib.sha256(data).hexdigest()
+
+
+def text_key(text: str) -> str:
+    """Key on the extracted text with case and whitespace normalized, so re-exported copies of a PDF still match."""
+    normalized = " ".join(text.casefold().split())
+    return "text:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class ParseCache:
+    """Content-addressed on-disk cache of parsed resume JSON, backed by SQLite.
+
+    Entries are keyed by :func:`pdf_key` and :func:`text_key`, both scoped to a ``namespace`` (the LLM model) so
+    a model change does not serve stale parses. Least recently used entries are evicted once the stored payloads
+    exceed ``max_bytes``.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, namespace: str = "") -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS parsed_resumes (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS parsed_resumes_last_used ON parsed_resumes (last_used);
+            """
+        )
+
+    def _scoped(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM parsed_resumes WHERE key = ?", (self._scoped(key),)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE parsed_resumes SET last_used = ? WHERE key = ?", (time.time(), self._scoped(key))
+            )
+            self._hits += 1
+            return row[0]
+
+    def set(self, keys: list[str], payload: str) -> None:
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO parsed_resumes (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                    [(self._scoped(key), payload, size, now) for key in keys],
+                )
+                self._evict()
+            except BaseException:
+                # Left open, the transaction would make every later BEGIN fail.
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits ``max_bytes``; must be called with the lock held."""
+        total = self._conn.execute("SELECT coalesce(sum(size), 0) FROM parsed_resumes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM parsed_resumes ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM parsed_resumes WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        self._evictions += evicted
+        logger.info(f"Parse cache evicted {evicted} entries, {total} bytes left")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT count(*), coalesce(sum(size), 0) FROM parsed_resumes").fetchone()
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
@@ -1,93 +1,186 @@
+import asyncio
 import logging
-import re
+import multiprocessing
 import typing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 
 import pymupdf
 from openai import AsyncOpenAI
+from pydantic import ValidationError
 
 from resume_parser.config.config import Path, settings
+from resume_parser.src.fast_path import extract_facts, llm_schema, merge_facts
 from resume_parser.src.models import SYSTEM_PROMPT, Resume
+from resume_parser.src.parse_cache import ParseCache, pdf_key, text_key
+from resume_parser.src.segmentation import parse_rendered_sections, render_sections, segment_document
 
 
-class ResumeParser:
-    def __init__(self, logger: logging.Logger) -> None:
-        self.llm_client = AsyncOpenAI(base_url=settings.llm_api_url, api_key=settings.llm_api_token.get_secret_value())
-        self.logger = logger
+# A PDF given either as a path on disk or as the raw bytes of an upload.
+type PdfSource = bytes | str | Path
 
-    def extract_text_from_pdf(self, file_path: str | Path) -> str:
-        try:
-            doc = pymupdf.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return self._preprocess_text(text)
 
-        except Exception:
-            self.logger.exception(f"Ошибка при извлечении текста из PDF {file_path}: ")
-            raise
+class PdfRejectedError(ValueError):
+    """Raised for PDFs that exceed the configured upload size or page count limits."""
+
+    def __init__(self, message: str, status_code: int = 422) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+    def __reduce__(self) -> tuple:
+        # Keep status_code when the error is pickled back from the extraction process pool.
+        return type(self), (str(self), self.status_code)
 
-    def _preprocess_resume_text(self, text: str, max_length: int = 8000) -> str:
-        if len(text) <= max_length:
-            return text
 
-        self.logger.info(f"Резюме слишком большое ({len(text)} символов), сокращаем до {max_length} символов")
+@dataclass
+class ParsedResume:
+    resume: Resume
+    cached: bool = False
 
-        beginning: typing.Final = text[: int(max_length * 0.3)]
 
-        middle_start: typing.Final = int(len(text) * 0.3)
-        middle_length: typing.Final = int(max_length * 0.5)
-        middle: typing.Final = text[middle_start : middle_start + middle_length]
+def extract_pdf_text(source: PdfSource, max_pages: int | None = None, max_chars: int | None = None) -> str:
+    """Extract a PDF as section-labelled, compacted text for the LLM prompt.
 
-        end_start: typing.Final = max(0, len(text) - int(max_length * 0.2))
-        end: typing.Final = text[end_start:]
+    The document is segmented by layout (see :mod:`resume_parser.src.segmentation`) and rendered within
+    ``max_chars``. This is a top-level function so it can run in the extraction process pool.
 
-        processed_text: typing.Final = (
-            beginning + "\n...[Текст резюме сокращен]...\n" + middle + "\n...[Текст резюме сокращен]...\n" + end
+    Raises:
+        PdfRejectedError: if the document has more than ``max_pages`` pages.
+
+    """
+    doc = pymupdf.open(stream=source, filetype="pdf") if isinstance(source, bytes) else pymupdf.open(source)
+    with doc:
+        if max_pages is not None and doc.page_count > max_pages:
+            raise PdfRejectedError(f"PDF содержит {doc.page_count} страниц, допускается не более {max_pages}")
+        sections = segment_document(doc)
+    return render_sections(sections, max_chars or settings.max_prompt_chars)
+
+
+def describe_source(source: PdfSource, filename: str | None = None) -> str:
+    if filename:
+        return filename
+    return f"<{len(source)} байт>" if isinstance(source, bytes) else str(source)
+
+
+class ResumeParser:
+    def __init__(self, logger: logging.Logger) -> None:
+        self.llm_client = AsyncOpenAI(base_url=settings.llm_api_url, api_key=settings.llm_api_token.get_secret_value())
+        self.logger = logger
+        # PyMuPDF extraction is CPU-bound, so it runs in a process pool sized to the cores and never blocks the
+        # event loop; "spawn" avoids forking the threaded server process. The semaphore bounds resumes being
+        # extracted and sent to the LLM at once.
+        self.extract_executor = ProcessPoolExecutor(
+            max_workers=settings.extract_workers, mp_context=multiprocessing.get_context("spawn")
         )
+        self.llm_semaphore = asyncio.Semaphore(settings.max_concurrency)
+        self.cache = ParseCache(settings.cache_path, settings.cache_max_bytes, namespace=settings.llm_api_model)
 
-        if len(processed_text) > max_length:
-            return processed_text[:max_length]
+    def extract_text_from_pdf(self, source: PdfSource, filename: str | None = None) -> str:
+        try:
+            return extract_pdf_text(source, settings.max_pages, settings.max_prompt_chars)
+        except Exception:
+            self.logger.exception(f"Ошибка при извлечении текста из PDF {describe_source(source, filename)}: ")
+            raise
+
+    async def extract_text(self, source: PdfSource, filename: str | None = None) -> str:
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.extract_executor, extract_pdf_text, source, settings.max_pages, settings.max_prompt_chars
+            )
+        except Exception:
+            self.logger.exception(f"Ошибка при извлечении текста из PDF {describe_source(source, filename)}: ")
+            raise
+
+    def close(self) -> None:
+        self.extract_executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
 
-        return processed_text
+    async def _cached(self, key: str) -> Resume | None:
+        if (payload := await asyncio.to_thread(self.cache.get, key)) is None:
+            return None
+        try:
+            return Resume.model_validate_json(payload)
+        except ValidationError:
+            # Entries written before a schema change are treated as misses and overwritten by the new parse.
+            self.logger.warning(f"Запись кэша {key} не соответствует схеме Resume, игнорируем")
+            return None
 
-    def _preprocess_text(self, text: str) -> str:
-        text = re.sub(r"\s+", " ", text)
-        text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]", "", text)
-        text = re.sub(r"([^\w\s])\1+", r"\1", text)
-        return text.strip()
+    async def _store(self, keys: list[str], resume: Resume) -> None:
+        # exclude_unset keeps unset defaults (e.g. education=None) out of the JSON so the entry validates on read.
+        await asyncio.to_thread(self.cache.set, keys, resume.model_dump_json(exclude_unset=True))
 
     def _raise_if_too_short(self, text: str) -> None:
         if len(text) < settings.allowed_min_len_resume:
             self.logger.warning(f"Извлеченный текст слишком короткий: {text[:50]}...")
             raise ValueError("Извлеченный текст слишком короткий для парсинга резюме")
 
-    async def parse_resume(self, file_path: str | Path) -> list[Resume]:
+    async def parse_resume(
+        self, source: PdfSource, filename: str | None = None, work_timeout: float | None = None
+    ) -> ParsedResume:
+        """Parse a resume with the LLM, reusing earlier results for identical PDF bytes or identical extracted text.
+
+        ``work_timeout`` bounds extraction and the LLM call only: it starts once a ``llm_semaphore`` slot is
+        acquired, so time spent queued behind other resumes does not count against it. Raises ``TimeoutError``
+        when exceeded.
+        """
+        label = describe_source(source, filename)
+        keys = [pdf_key(source)] if isinstance(source, bytes) else []
         try:
-            resume_text = self.extract_text_from_pdf(file_path)
-            self._raise_if_too_short(resume_text)
-
-            user_prompt = f"""
-            Вот текст резюме:\n{resume_text}\n
-            Извлеки всю доступную информацию и верни ее в структурированном виде.
-            """
-
-            completion = await self.llm_client.beta.chat.completions.parse(
-                model=settings.llm_api_model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.15,
-                response_format=Resume,
-            )
-            structured_data = completion.choices[0].message.parsed
+            if keys and (cached := await self._cached(keys[0])) is not None:
+                self.logger.info(f"Резюме {label} найдено в кэше по хэшу PDF")
+                return ParsedResume(cached, cached=True)
 
+            async with self.llm_semaphore, asyncio.timeout(work_timeout):
+                return await self._extract_and_parse(source, filename, label, keys)
+        except TimeoutError:
+            raise
         except Exception:
-            self.logger.exception(f"Ошибка при парсинге резюме {file_path}")
+            self.logger.exception(f"Ошибка при парсинге резюме {label}")
             raise
 
-        return structured_data
+    async def _extract_and_parse(
+        self, source: PdfSource, filename: str | None, label: str, keys: list[str]
+    ) -> ParsedResume:
+        resume_text = await self.extract_text(source, filename)
+        self._raise_if_too_short(resume_text)
+
+        keys.append(text_key(resume_text))
+        if (cached := await self._cached(keys[-1])) is not None:
+            self.logger.info(f"Резюме {label} найдено в кэше по хэшу текста")
+            await self._store(keys, cached)
+            return ParsedResume(cached, cached=True)
+
+        # Contacts, skill/language lists and date ranges are extracted deterministically; the LLM only fills
+        # the remaining fields through a correspondingly smaller schema.
+        facts = extract_facts(resume_text, parse_rendered_sections(resume_text))
+
+        user_prompt = f"""
+        Вот текст резюме:\n{resume_text}\n
+        Извлеки всю доступную информацию и верни ее в структурированном виде.
+        """
+
+        completion = await self.llm_client.beta.chat.completions.parse(
+            model=settings.llm_api_model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            temperature=0.15,
+            response_format=llm_schema(facts.omitted_fields, contacts_known=facts.contacts_known),
+        )
+        structured_data = merge_facts(completion.choices[0].message.parsed, facts)
+        await self._store(keys, structured_data)
+        return ParsedResume(structured_data)
+
+    async def parse_resume_with_timeout(self, source: PdfSource, filename: str | None = None) -> ParsedResume:
+        """Parse one resume, giving up after ``RESUME_PARSER_FILE_TIMEOUT`` seconds of extraction and LLM work."""
+        try:
+            return await self.parse_resume(source, filename, work_timeout=settings.file_timeout)
+        except TimeoutError as e:
+            self.logger.warning(
+                f"Превышено время парсинга резюме {describe_source(source, filename)} ({settings.file_timeout} с)"
+            )
+            raise TimeoutError(f"Парсинг занял больше {settings.file_timeout} секунд") from e
 
     async def batch_parse_resumes(self, directory_path: str | Path) -> list[Resume]:
         directory: typing.Final = Path(directory_path)
@@ -98,16 +191,17 @@ class ResumeParser:
         pdf_files: typing.Final = list(directory.glob("*.pdf"))
         self.logger.info(f"Найдено {len(pdf_files)} PDF-файлов в директории {directory}")
 
+        results: typing.Final = await asyncio.gather(
+            *(self.parse_resume_with_timeout(pdf_file) for pdf_file in pdf_files), return_exceptions=True
+        )
+
         resume_data_list: typing.Final = []
-        for pdf_file in pdf_files:
-            try:
-                self.logger.info(f"Парсинг файла: {pdf_file}")
-                resume_data = await self.parse_resume(pdf_file)
-                resume_data_list.append(resume_data)
-                self.logger.info(f"Успешно распарсено резюме: {resume_data.name}")
-            except Exception:
-                self.logger.exception(f"Ошибка при парсинге {pdf_file}")
+        for pdf_file, resume_data in zip(pdf_files, results, strict=True):
+            if isinstance(resume_data, BaseException):
+                self.logger.error(f"Ошибка при парсинге {pdf_file}: {resume_data!r}")
                 continue
+            resume_data_list.append(resume_data.resume)
+            self.logger.info(f"Успешно распарсено резюме: {resume_data.resume.name}")
 
         self.logger.info(f"Всего успешно обработано {len(resume_data_list)} из {len(pdf_files)} PDF-файлов")
         return resume_data_list
@@ -0,0 +1,197 @@
+import re
+from collections import Counter
+from dataclasses import dataclass
+from statistics import median
+
+import pymupdf
+
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+CONTROL_CHARS_PATTERN = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\xff]")
+REPEATED_PUNCTUATION_PATTERN = re.compile(r"([^\w\s])\1+")
+PAGE_NUMBER_PATTERN = re.compile(r"^(?:(?:стр\.?|страница|page)\s*)?\d+(?:\s*(?:из|of|/)\s*\d+)?$", re.IGNORECASE)
+
+BOLD_FLAG = 16
+HEADING_SIZE_RATIO = 1.15
+MAX_HEADING_WORDS = 5
+
+# Section name -> heading keywords (matched against the lowercased heading without a trailing colon).
+SECTION_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "contacts": ("контакты", "контактная информация", "contacts", "contact information", "contact"),
+    "summary": ("о себе", "обо мне", "цель", "профиль", "summary", "profile", "about me", "objective"),
+    "experience": ("опыт работы", "опыт", "трудовая деятельность", "experience", "work experience", "employment"),
+    "education": ("образование", "education"),
+    "skills": ("навыки", "ключевые навыки", "технологии", "стек", "skills", "technical skills", "tech stack"),
+    "languages": ("языки", "знание языков", "иностранные языки", "languages"),
+    "certifications": ("сертификаты", "сертификаты и курсы", "курсы", "certifications", "certificates", "courses"),
+    "portfolio": ("проекты", "портфолио", "projects", "portfolio"),
+    "hobbies": ("хобби", "интересы", "увлечения", "hobbies", "interests"),
+}
+SECTION_TITLES = {
+    "header": "Header",
+    "contacts": "Contacts",
+    "summary": "Summary",
+    "experience": "Experience",
+    "education": "Education",
+    "skills": "Skills",
+    "languages": "Languages",
+    "certifications": "Certifications",
+    "portfolio": "Portfolio",
+    "hobbies": "Hobbies",
+}
+# When the prompt is over budget, sections are shortened from the end of this list first.
+SECTION_PRIORITY = [
+    "header",
+    "contacts",
+    "experience",
+    "education",
+    "skills",
+    "summary",
+    "languages",
+    "certifications",
+    "portfolio",
+    "hobbies",
+]
+TRUNCATION_MARK = "...[сокращено]"
+
+
+@dataclass
+class _Line:
+    text: str
+    size: float
+    bold: bool
+    page: int
+
+
+def preprocess_text(text: str) -> str:
+    text = WHITESPACE_PATTERN.sub(" ", text)
+    text = CONTROL_CHARS_PATTERN.sub("", text)
+    text = REPEATED_PUNCTUATION_PATTERN.sub(r"\1", text)
+    return text.strip()
+
+
+def _read_lines(doc: pymupdf.Document) -> list[_Line]:
+    lines = []
+    for page_number, page in enumerate(doc):
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                text = preprocess_text("".join(span["text"] for span in line["spans"]))
+                if not spans or not text:
+                    continue
+                lines.append(
+                    _Line(
+                        text=text,
+                        size=max(span["size"] for span in spans),
+                        bold=all(span["flags"] & BOLD_FLAG or "bold" in span["font"].lower() for span in spans),
+                        page=page_number,
+                    )
+                )
+    return lines
+
+
+def _drop_page_furniture(lines: list[_Line], page_count: int) -> list[_Line]:
+    """Remove page numbers and running headers/footers repeated on every page (keeping their first occurrence)."""
+    pages_per_text = Counter()
+    for text in {(line.text, line.page) for line in lines}:
+        pages_per_text[text[0]] += 1
+    repeated = {text for text, pages in pages_per_text.items() if page_count > 1 and pages == page_count}
+
+    kept, seen = [], set()
+    for line in lines:
+        if PAGE_NUMBER_PATTERN.match(line.text):
+            continue
+        if line.text in repeated:
+            if line.text in seen:
+                continue
+            seen.add(line.text)
+        kept.append(line)
+    return kept
+
+
+def _heading_section(line: _Line, body_size: float) -> str | None:
+    """Return the section a line opens, or ``None`` if it is not a heading.
+
+    A short line is a heading when it is exactly a known section keyword, or when it is styled as a heading
+    (bold, larger than body text or upper case) and starts with one as a whole word, so "Skills & tools" opens
+    the skills section but "Skillsoft" or "Educational projects" do not.
+    """
+    normalized = line.text.rstrip(":").strip().casefold()
+    if len(normalized.split()) > MAX_HEADING_WORDS:
+        return None
+    styled = line.bold or line.size >= body_size * HEADING_SIZE_RATIO or line.text.isupper()
+    for section, keywords in SECTION_KEYWORDS.items():
+        for keyword in keywords:
+            if normalized == keyword or (
+                styled and normalized.startswith(keyword) and not normalized[len(keyword)].isalnum()
+            ):
+                return section
+    return None
+
+
+def segment_document(doc: pymupdf.Document) -> dict[str, list[str]]:
+    """Split a resume into sections (header, experience, education, skills, ...) using font size and weight.
+
+    Text before the first recognized heading goes to ``header``, which usually holds the name and contacts.
+    Sections keep their line structure; repeated headings (e.g. a second "Опыт работы" page) are merged.
+    """
+    lines = _drop_page_furniture(_read_lines(doc), doc.page_count)
+    if not lines:
+        return {}
+
+    sizes = [line.size for line in lines for _ in range(len(line.text))]
+    body_size = median(sizes)
+
+    sections: dict[str, list[str]] = {"header": []}
+    current = "header"
+    for line in lines:
+        if (section := _heading_section(line, body_size)) is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line.text)
+    return {name: section_lines for name, section_lines in sections.items() if section_lines}
+
+
+def render_sections(sections: dict[str, list[str]], max_chars: int) -> str:
+    """Render sections as ``## Title`` blocks within ``max_chars``.
+
+    Over budget, lines are dropped from the end of the lowest-priority sections first, so the header, experience
+    and education survive intact unless everything else has already been cut.
+    """
+    sections = {name: list(section_lines) for name, section_lines in sections.items()}
+
+    def render() -> str:
+        return "\n\n".join(
+            f"## {SECTION_TITLES[name]}\n" + "\n".join(section_lines) for name, section_lines in sections.items()
+        )
+
+    text = render()
+    overflow = len(text) - max_chars
+    for name in reversed(SECTION_PRIORITY):
+        if overflow <= 0:
+            break
+        section_lines = sections.get(name)
+        if not section_lines:
+            continue
+        while section_lines and overflow > 0:
+            overflow -= len(section_lines.pop()) + 1
+        section_lines.append(TRUNCATION_MARK)
+        overflow += len(TRUNCATION_MARK) + 1
+
+    text = render()
+    return text[:max_chars]
+
+
+def parse_rendered_sections(text: str) -> dict[str, list[str]]:
+    """Inverse of :func:`render_sections`: map section names back to their lines."""
+    names = {title: name for name, title in SECTION_TITLES.items()}
+    sections: dict[str, list[str]] = {}
+    current = None
+    for line in text.split("\n"):
+        if line.startswith("## ") and line[3:] in names:
+            current = names[line[3:]]
+            sections.setdefault(current, [])
+        elif current is not None and line and line != TRUNCATION_MARK:
+            sections[current].append(line)
+    return sections
@@ -2,9 +2,9 @@ import json
 import logging
 
 import psycopg2
+from psycopg2.extras import execute_values
 
 from resume_parser.config.config import settings
-from resume_parser.src.models import Resume
 
 
 db_params = {
@@ -33,23 +33,99 @@ def resume_to_sql_values(resume: dict) -> tuple:
     )
 
 
-def insert_resumes_to_db(resumes: list[Resume], logger: logging.Logger) -> None:
-    insert_query = """
-    INSERT INTO resumes (
-        name, gender, title, summary, contact_info,
-        skills, experience, education,
-        languages, certifications, hobbies, portfolio
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+UPSERT_QUERY = """
+INSERT INTO resumes (
+    name, gender, title, summary, contact_info,
+    skills, experience, education,
+    languages, certifications, hobbies, portfolio
+) VALUES %s
+ON CONFLICT (name) DO UPDATE SET
+    gender = EXCLUDED.gender,
+    title = EXCLUDED.title,
+    summary = EXCLUDED.summary,
+    contact_info = EXCLUDED.contact_info,
+    skills = EXCLUDED.skills,
+    experience = EXCLUDED.experience,
+    education = EXCLUDED.education,
+    languages = EXCLUDED.languages,
+    certifications = EXCLUDED.certifications,
+    hobbies = EXCLUDED.hobbies,
+    portfolio = EXCLUDED.portfolio
+RETURNING name, (xmax = 0) AS inserted
+"""
+
+
+def _upsert(cursor: psycopg2.extensions.cursor, resumes: list[dict]) -> dict[str, str]:
+    """Upsert ``resumes`` in one statement inside a savepoint; return ``{name: "inserted" | "updated"}``."""
+    cursor.execute("SAVEPOINT upsert_resumes")
+    try:
+        rows = execute_values(
+            cursor,
+            UPSERT_QUERY,
+            [resume_to_sql_values(resume) for resume in resumes],
+            page_size=max(len(resumes), 1),
+            fetch=True,
+        )
+    except psycopg2.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT upsert_resumes")
+        raise
+    cursor.execute("RELEASE SAVEPOINT upsert_resumes")
+    return {name: "inserted" if inserted else "updated" for name, inserted in rows}
+
+
+def _latest_by_name(resumes: list[dict], statuses: list[dict]) -> dict[str, int]:
+    """Map each name to the index of its last occurrence, flagging nameless and superseded rows in ``statuses``.
+
+    ON CONFLICT DO UPDATE cannot touch the same row twice in one statement, so only the last occurrence is written.
     """
+    latest: dict[str, int] = {}
+    for index, resume in enumerate(resumes):
+        if not resume.get("name"):
+            statuses[index]["error"] = "Resume has no name"
+            continue
+        if resume["name"] in latest:
+            statuses[latest[resume["name"]]]["status"] = "duplicate"
+        latest[resume["name"]] = index
+    return latest
+
+
+def insert_resumes_to_db(resumes: list[dict], logger: logging.Logger) -> list[dict]:
+    """Upsert parsed resumes by ``name`` and return a status per input resume, in input order.
+
+    The whole batch is written with a single multi-row ``INSERT ... ON CONFLICT (name) DO UPDATE``. If that
+    statement fails, the batch is retried row by row under savepoints so that only the offending rows are
+    reported as errors and every valid row is still committed.
+
+    Each status is ``{"name": ..., "status": "inserted" | "updated" | "duplicate" | "error"}``, with an
+    ``"error"`` message for failed rows; ``"duplicate"`` marks an earlier row superseded by a later one with the
+    same name in the same batch.
+    """
+    statuses: list[dict] = [{"name": resume.get("name"), "status": "error"} for resume in resumes]
+    latest = _latest_by_name(resumes, statuses)
+    batch = [resumes[index] for index in latest.values()]
+
     try:
         with psycopg2.connect(**db_params) as conn, conn.cursor() as cursor:
-            for resume in resumes:
-                try:
-                    cursor.execute(insert_query, resume_to_sql_values(resume))
-                except Exception:
-                    conn.rollback()
-                    logger.exception(f"Error inserting resume {resume.name}")
-                    continue
+            try:
+                results = _upsert(cursor, batch) if batch else {}
+            except psycopg2.Error:
+                logger.warning("Batch upsert failed, retrying resumes one by one")
+                results = {}
+                for resume in batch:
+                    try:
+                        results.update(_upsert(cursor, [resume]))
+                    except psycopg2.Error as e:
+                        logger.exception(f"Error inserting resume {resume['name']}")
+                        statuses[latest[resume["name"]]]["error"] = str(e).strip()
             conn.commit()
-    except Exception:
-        logger.exception("Failed to connect to the database")
+    except psycopg2.Error as e:
+        logger.exception("Failed to write resumes to the database")
+        for index in latest.values():
+            statuses[index]["error"] = str(e).strip()
+        return statuses
+
+    for name, index in latest.items():
+        if name in results:
+            statuses[index]["status"] = results[name]
+    logger.info(f"Upserted {len(results)} of {len(resumes)} resumes")
+    return statuses
@@ -1,4 +1,6 @@
+import json
 import os
+from collections.abc import Iterator
 from pathlib import Path
 
 import requests
@@ -11,6 +13,7 @@ import streamlit as st
 AGENT_HOST = os.getenv("AGENT_HOST")
 AGENT_PORT = os.getenv("AGENT_PORT")
 AGENT_API_URL = f"http://{AGENT_HOST}:{AGENT_PORT}/agent_query"
+AGENT_STREAM_API_URL = f"{AGENT_API_URL}/stream"
 
 
 def display_conversation(history: list[dict[str, str]]) -> None:
@@ -30,16 +33,44 @@ def clear_chat(chat_type: str) -> None:
         pass
 
 
-def get_agent_response(request: AgentQueryRequest) -> str:
-    """Send query to the agent API and return the response."""
+def stream_agent_events(request: AgentQueryRequest) -> Iterator[dict]:
+    """Send query to the streaming agent API and yield its NDJSON events as they arrive."""
     headers = {"Content-Type": "application/json"}
     try:
-        response = requests.post(AGENT_API_URL, json=request.model_dump(), headers=headers, timeout=120)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("response", "⚠️ Ответ отсутствует.")
+        with requests.post(
+            AGENT_STREAM_API_URL, json=request.model_dump(), headers=headers, timeout=120, stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if line:
+                    yield json.loads(line)
     except requests.exceptions.RequestException as e:
-        return f"❌ Ошибка при запросе к API {AGENT_API_URL}: {e!s}"
+        yield {"event": "error", "data": f"❌ Ошибка при запросе к API {AGENT_STREAM_API_URL}: {e!s}"}
+
+
+def render_agent_stream(request: AgentQueryRequest) -> str:
+    """Render agent events incrementally and return the final answer."""
+    status = st.empty()
+    answer_placeholder = st.empty()
+    answer = ""
+    status.caption("🧠 Думаю...")
+    for event in stream_agent_events(request):
+        kind, data = event.get("event"), event.get("data")
+        if kind == "sql":
+            st.code(data, language="sql")
+        elif kind == "rows":
+            status.caption(f"📊 Найдено строк: {data}")
+        elif kind == "sql_error":
+            status.caption(f"⚠️ Ошибка SQL: {data}")
+        elif kind in {"token", "answer"}:
+            answer += data
+            answer_placeholder.markdown(f"**Бот:** {answer}")
+        elif kind == "done":
+            answer = data or answer
+        elif kind == "error":
+            answer = data
+            answer_placeholder.markdown(f"**Бот:** {answer}")
+    return answer or "⚠️ Ответ отсутствует."
 
 
 def agent_chat() -> None:
@@ -53,14 +84,13 @@ def agent_chat() -> None:
     for i, entry in enumerate(st.session_state.conversation_history_agentic_rag):
         st.markdown(f"**Вы:** {entry['user']}")
         if entry["bot"] is None:
-            with st.spinner("🧠 Думаю..."):
-                request = AgentQueryRequest(
-                    agent=st.session_state.get("selected_agent", "default"),
-                    query=entry["user"],
-                )
-                answer = get_agent_response(request)
-                st.session_state.conversation_history_agentic_rag[i]["bot"] = answer
-                st.rerun()
+            request = AgentQueryRequest(
+                agent=st.session_state.get("selected_agent", "default"),
+                query=entry["user"],
+            )
+            answer = render_agent_stream(request)
+            st.session_state.conversation_history_agentic_rag[i]["bot"] = answer
+            st.rerun()
         else:
             st.markdown(f"**Бот:** {entry['bot']}")
 
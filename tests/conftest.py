@@ -0,0 +1,15 @@
+import os
+
+
+# The service settings require database and LLM credentials; unit tests never connect, so placeholders are enough.
+for name, value in {
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "LLM_API_URL": "http://localhost/v1",
+    "LLM_API_TOKEN": "test",
+    "LLM_API_MODEL": "test",
+}.items():
+    os.environ.setdefault(name, value)
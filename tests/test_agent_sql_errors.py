@@ -0,0 +1,59 @@
+import asyncio
+
+import psycopg2
+import pytest
+
+from agent.src import self_written_agent
+from agent.src.result_encoder import SQL_ERROR_PREFIX, encode_result, is_sql_error
+from agent.src.sql_cache import sql_result_cache
+from agent.src.sql_executor import QueryResult
+from agent.src.streaming import _rows_event
+
+
+@pytest.fixture
+def failing_executor(monkeypatch: pytest.MonkeyPatch) -> None:
+    def execute(_query: str, _cursor_factory: type | None = None) -> QueryResult:
+        raise psycopg2.errors.QueryCanceled("canceling statement due to statement timeout")
+
+    monkeypatch.setattr(self_written_agent, "execute_bounded", execute)
+    monkeypatch.setattr(sql_result_cache, "fetch", lambda _query, _namespace, run: run())
+
+
+@pytest.mark.usefixtures("failing_executor")
+def test_database_error_is_not_an_empty_result() -> None:
+    result = self_written_agent.sql_engine("SELECT id FROM resumes")
+
+    assert result.error is not None
+    assert "statement timeout" in result.error
+    encoded = encode_result(result)
+    assert is_sql_error(encoded)
+    assert not encoded.startswith("rows: 0")
+
+
+@pytest.mark.usefixtures("failing_executor")
+def test_failed_sql_answer_is_not_cacheable(monkeypatch: pytest.MonkeyPatch) -> None:
+    action = self_written_agent.AgentAction(
+        function="sql_engine", reasoning="", is_dangerous=False, sql_query="SELECT id FROM resumes"
+    )
+    monkeypatch.setattr(self_written_agent, "analyze_user_message", lambda _message: _resolved(action))
+    monkeypatch.setattr(self_written_agent, "format_sql_result_with_llm", lambda **_: _resolved(""))
+
+    reply = asyncio.run(self_written_agent.process_user_message("Кто знает Python?"))
+
+    assert not reply.cacheable
+
+
+def test_stream_reports_sql_error_instead_of_rows() -> None:
+    assert _rows_event(f"{SQL_ERROR_PREFIX}database error: timeout") == {
+        "event": "sql_error",
+        "data": "database error: timeout",
+    }
+    assert _rows_event('rows: 2\n{"columns":["id"],"rows":[[1],[2]]}') == {
+        "event": "rows",
+        "data": 2,
+        "truncated": False,
+    }
+
+
+async def _resolved[T](value: T) -> T:
+    return value
@@ -0,0 +1,38 @@
+import pytest
+
+from agent.config.config import settings
+from agent.src.cost_guard import guard_query
+
+
+class PlanCursor:
+    """Cursor stub answering EXPLAIN: queries wrapped in a LIMIT are cheap, everything else is too expensive."""
+
+    def __init__(self) -> None:
+        self.explained: list[str] = []
+
+    def execute(self, statement: str) -> None:
+        self.explained.append(statement.removeprefix("EXPLAIN (FORMAT JSON) "))
+
+    def fetchone(self) -> tuple[list[dict]]:
+        limited = "limited_result" in self.explained[-1]
+        cost = 1.0 if limited else settings.sql_max_cost * 10
+        return ([{"Plan": {"Total Cost": cost, "Plan Rows": 1}}],)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT id FROM resumes -- all candidates",
+        "SELECT id FROM resumes; -- all candidates",
+        "SELECT id /* ids */ FROM resumes ;\n",
+    ],
+)
+def test_commented_query_is_wrapped_in_limit(query: str) -> None:
+    cursor = PlanCursor()
+
+    rewritten, was_rewritten = guard_query(cursor, query)
+
+    assert was_rewritten
+    expected = f"SELECT * FROM (SELECT id FROM resumes) AS limited_result LIMIT {settings.sql_row_limit + 1}"  # noqa: S608
+    assert " ".join(rewritten.split()) == expected
+    assert cursor.explained[-1] == rewritten
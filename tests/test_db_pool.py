@@ -0,0 +1,63 @@
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from agent.src.db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.closed = 0
+
+    def get_transaction_status(self) -> int:
+        return TRANSACTION_STATUS_IDLE
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = 1
+
+
+@pytest.fixture
+def db_pool(monkeypatch: pytest.MonkeyPatch) -> ConnectionPool:
+    monkeypatch.setattr(psycopg2, "connect", lambda **_: FakeConnection())
+    return ConnectionPool(
+        {},
+        max_size=1,
+        checkout_timeout=0.05,
+        max_lifetime=3600,
+        max_idle=3600,
+        health_check_interval=3600,
+    )
+
+
+def test_exhausted_pool_times_out(db_pool: ConnectionPool) -> None:
+    held = db_pool.getconn()
+
+    with pytest.raises(PoolTimeoutError):
+        db_pool.getconn()
+    assert db_pool.stats()["timeouts"] == 1
+
+    db_pool.putconn(held)
+    assert db_pool.getconn() is held
+
+
+def test_connection_broken_by_block_is_discarded(db_pool: ConnectionPool) -> None:
+    with pytest.raises(psycopg2.OperationalError), db_pool.connection() as conn:
+        raise psycopg2.OperationalError
+
+    assert conn.closed
+    assert db_pool.stats()["discarded"] == 1
+    with db_pool.connection() as fresh:
+        assert fresh is not conn
+
+
+def test_connection_kept_after_statement_timeout(db_pool: ConnectionPool) -> None:
+    with pytest.raises(psycopg2.extensions.QueryCanceledError), db_pool.connection() as conn:
+        raise psycopg2.extensions.QueryCanceledError
+
+    assert not conn.closed
+    assert db_pool.stats()["discarded"] == 0
+    with db_pool.connection() as reused:
+        assert reused is conn
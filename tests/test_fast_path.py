@@ -0,0 +1,90 @@
+from pydantic import BaseModel
+
+from resume_parser.src.fast_path import FastPathFacts, extract_facts, llm_schema, merge_facts, split_list
+from resume_parser.src.segmentation import parse_rendered_sections
+
+
+RESUME_TEXT = """## Header
+Иван Петров
+ivan@example.com, +7 (999) 123-45-67
+
+## Experience
+ООО Ромашка, Python-разработчик
+2020-01 - н.в.
+Разработка API
+АО Лютик, Junior developer
+2015-09 - 2019-12
+Поддержка legacy-кода
+
+## Skills
+Python, SQL, Docker, Опыт работы с высоконагруженными системами, Kafka, Redis, Git, Linux
+"""
+
+
+def _draft(experience: list[dict], *, omitted: frozenset[str] = frozenset()) -> BaseModel:
+    schema = llm_schema(omitted, contacts_known=True)
+    data = {
+        "name": "Иван Петров",
+        "location": "Россия",
+        "gender": "мужской",
+        "title": "Python-разработчик",
+        "summary": None,
+        "experience": experience,
+    }
+    return schema.model_validate({key: value for key, value in data.items() if key in schema.model_fields})
+
+
+def _facts() -> FastPathFacts:
+    return extract_facts(RESUME_TEXT, parse_rendered_sections(RESUME_TEXT))
+
+
+def test_merge_facts_matches_ranges_to_entries_by_company_not_position() -> None:
+    facts = _facts()
+    draft = _draft(
+        [
+            {"job_title": "Junior developer", "company": "АО Лютик", "start_date": "2015", "end_date": "2019"},
+            {"job_title": "Python-разработчик", "company": "ООО Ромашка", "start_date": "2020", "end_date": None},
+        ],
+        omitted=facts.omitted_fields,
+    )
+
+    resume = merge_facts(draft, facts)
+
+    first, second = resume.experience
+    assert (first.company, first.start_date, first.end_date) == ("АО Лютик", "2015-09", "2019-12")
+    assert (second.company, second.start_date, second.end_date) == ("ООО Ромашка", "2020-01", None)
+
+
+def test_merge_facts_keeps_llm_dates_for_unmatched_entries() -> None:
+    facts = _facts()
+    draft = _draft(
+        [{"job_title": "Аналитик", "company": "ЗАО Василек", "start_date": "2012-03", "end_date": "2014-05"}],
+        omitted=facts.omitted_fields,
+    )
+
+    resume = merge_facts(draft, facts)
+
+    assert (resume.experience[0].start_date, resume.experience[0].end_date) == ("2012-03", "2014-05")
+
+
+def test_merge_facts_fills_contacts() -> None:
+    facts = _facts()
+    resume = merge_facts(_draft([], omitted=facts.omitted_fields), facts)
+
+    assert resume.contact_info.email == "ivan@example.com"
+    assert resume.contact_info.location == "Россия"
+
+
+def test_split_list_rejects_sentence_like_items() -> None:
+    items, rejected = split_list(
+        ["Python, SQL, Опыт работы с высоконагруженными системами, CI/CD (Jenkins, GitLab CI)"]
+    )
+
+    assert items == ["Python", "SQL", "CI/CD (Jenkins, GitLab CI)"]
+    assert rejected == 1
+
+
+def test_noisy_skill_list_is_left_to_the_llm() -> None:
+    facts = extract_facts("", {"skills": ["Опыт работы с Python", "Знание SQL", "Умение работать в команде", "Git"]})
+
+    assert "skills" not in facts.lists
@@ -0,0 +1,75 @@
+import logging
+from typing import Self
+
+import psycopg2
+import pytest
+
+from resume_parser.src import utils
+
+
+logger = logging.getLogger(__name__)
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.committed = False
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        pass
+
+    def cursor(self) -> Self:
+        return self
+
+    def commit(self) -> None:
+        self.committed = True
+
+
+@pytest.fixture
+def database(monkeypatch: pytest.MonkeyPatch) -> FakeConnection:
+    """Fake database holding one existing resume; upserting a resume named ``bad`` fails."""
+    conn = FakeConnection()
+    existing = {"Анна"}
+
+    def upsert(_cursor: FakeConnection, resumes: list[dict]) -> dict[str, str]:
+        if any(resume["name"] == "bad" for resume in resumes):
+            msg = "value too long for type character varying(255)"
+            raise psycopg2.DataError(msg)
+        return {resume["name"]: "updated" if resume["name"] in existing else "inserted" for resume in resumes}
+
+    monkeypatch.setattr(utils.psycopg2, "connect", lambda **_: conn)
+    monkeypatch.setattr(utils, "_upsert", upsert)
+    return conn
+
+
+def test_statuses_follow_input_order(database: FakeConnection) -> None:
+    resumes = [{"name": "Анна"}, {"name": "Борис"}, {"name": "Борис", "title": "newer"}, {"title": "nameless"}]
+
+    statuses = utils.insert_resumes_to_db(resumes, logger)
+
+    assert [status["status"] for status in statuses] == ["updated", "duplicate", "inserted", "error"]
+    assert statuses[3]["error"] == "Resume has no name"
+    assert database.committed
+
+
+def test_failed_batch_is_retried_row_by_row(database: FakeConnection) -> None:
+    statuses = utils.insert_resumes_to_db([{"name": "Анна"}, {"name": "bad"}, {"name": "Вера"}], logger)
+
+    assert [status["status"] for status in statuses] == ["updated", "error", "inserted"]
+    assert "value too long" in statuses[1]["error"]
+    assert database.committed
+
+
+def test_connection_failure_marks_every_row_as_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    def refuse(**_: object) -> None:
+        msg = "connection refused"
+        raise psycopg2.OperationalError(msg)
+
+    monkeypatch.setattr(utils.psycopg2, "connect", refuse)
+
+    statuses = utils.insert_resumes_to_db([{"name": "Анна"}, {"name": "Борис"}], logger)
+
+    assert all(status["status"] == "error" for status in statuses)
+    assert all(status["error"] == "connection refused" for status in statuses)
@@ -0,0 +1,32 @@
+import asyncio
+
+from resume_generator.src.jobs import GenerationJob, JobManager, JobStatus
+
+
+def test_job_cancelled_before_it_starts_is_marked_cancelled() -> None:
+    async def scenario() -> GenerationJob:
+        manager = JobManager(history=10)
+        job = manager.submit(total=1, run=lambda _job: asyncio.sleep(10))
+        manager.cancel(job.id)
+        await asyncio.gather(job.task, return_exceptions=True)
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status is JobStatus.CANCELLED
+    assert job.finished_at is not None
+    assert job.to_dict()["status"] == "cancelled"
+
+
+def test_running_job_cancel_and_completion() -> None:
+    async def scenario() -> tuple[GenerationJob, GenerationJob]:
+        manager = JobManager(history=10)
+        slow = manager.submit(total=1, run=lambda _job: asyncio.sleep(10))
+        fast = manager.submit(total=1, run=lambda _job: asyncio.sleep(0))
+        await asyncio.sleep(0.01)
+        manager.cancel(slow.id)
+        await asyncio.gather(slow.task, fast.task, return_exceptions=True)
+        return slow, fast
+
+    slow, fast = asyncio.run(scenario())
+    assert slow.status is JobStatus.CANCELLED
+    assert fast.status is JobStatus.COMPLETED
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+from pydantic import BaseModel
+
+from resume_generator.src.llm_client import AdaptiveLimiter, LlmClient, LlmRequestError, RetryBudget, TokenBucket
+
+
+class Answer(BaseModel):
+    text: str
+
+
+def server_error(headers: dict | None = None) -> openai.InternalServerError:
+    request = httpx.Request("POST", "http://llm/v1/chat/completions")
+    response = httpx.Response(500, headers=headers, request=request)
+    return openai.InternalServerError("overloaded", response=response, body=None)
+
+
+class FakeCompletions:
+    def __init__(self, outcomes: list) -> None:
+        self.outcomes = outcomes
+        self.calls = 0
+
+    async def parse(self, **_: object) -> SimpleNamespace:
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        message = SimpleNamespace(parsed=outcome)
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message)])
+
+
+def make_client(outcomes: list, retry_budget: RetryBudget, max_attempts: int = 5) -> tuple[LlmClient, FakeCompletions]:
+    completions = FakeCompletions(outcomes)
+    fake = SimpleNamespace(beta=SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    client = LlmClient(
+        fake,
+        "model",
+        max_concurrency=4,
+        initial_concurrency=2,
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        output_tokens_estimate=100,
+        max_attempts=max_attempts,
+        retry_delay=0,
+        max_retry_delay=5,
+        retry_budget=retry_budget,
+    )
+    return client, completions
+
+
+MESSAGES = [{"role": "user", "content": "Сгенерируй резюме"}]
+
+
+def test_retries_until_success() -> None:
+    client, completions = make_client([server_error(), Answer(text="ok")], RetryBudget(ratio=0.2, reserve=10))
+
+    answer = asyncio.run(client.parse(MESSAGES, Answer, temperature=0))
+
+    assert answer.text == "ok"
+    assert completions.calls == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_spent_retry_budget_stops_retrying() -> None:
+    client, completions = make_client([server_error()], RetryBudget(ratio=0, reserve=1))
+
+    with pytest.raises(LlmRequestError, match="budget exhausted"):
+        asyncio.run(client.parse(MESSAGES, Answer, temperature=0))
+
+    assert completions.calls == 2
+    assert client.stats()["budget_exhausted"] == 1
+
+
+def test_all_attempts_failing_raises() -> None:
+    client, completions = make_client([None], RetryBudget(ratio=0, reserve=10), max_attempts=3)
+
+    with pytest.raises(LlmRequestError, match="after 3 attempts"):
+        asyncio.run(client.parse(MESSAGES, Answer, temperature=0))
+
+    assert completions.calls == 3
+    assert client.stats()["empty"] == 3
+
+
+def test_retry_after_is_capped() -> None:
+    client, _ = make_client([], RetryBudget(ratio=0, reserve=1))
+
+    assert client._backoff(1, server_error({"retry-after": "3"})) == 3  # noqa: SLF001
+    assert client._backoff(1, server_error({"retry-after": "3600"})) == 5  # noqa: SLF001
+
+
+def test_limiter_halves_once_per_overload_window_and_grows_on_success() -> None:
+    async def scenario() -> list[float]:
+        limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=8)
+        first = await limiter.acquire()
+        second = await limiter.acquire()
+        await limiter.release(first, success=False, overloaded=True)
+        await limiter.release(second, success=False, overloaded=True)
+        halved = limiter.limit
+        await limiter.release(await limiter.acquire(), success=True, overloaded=False)
+        return [halved, limiter.limit]
+
+    assert asyncio.run(scenario()) == [2, 2.5]
+
+
+def test_token_bucket_charges_and_refunds() -> None:
+    async def scenario() -> TokenBucket:
+        bucket = TokenBucket(per_minute=6000)
+        await bucket.acquire(6000)
+        bucket.adjust(-3000)
+        return bucket
+
+    bucket = asyncio.run(scenario())
+    assert 3000 <= bucket._tokens < 3100  # noqa: SLF001
+    assert not TokenBucket(per_minute=0).enabled
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pytest
+
+from resume_parser.src.parse_cache import ParseCache
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> ParseCache:
+    cache = ParseCache(tmp_path / "cache.sqlite3", max_bytes=1_000, namespace="model")
+    yield cache
+    cache.close()
+
+
+def test_failed_set_rolls_back_and_later_sets_succeed(cache: ParseCache, monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail() -> None:
+        raise OSError("disk I/O error")
+
+    monkeypatch.setattr(cache, "_evict", fail)
+    with pytest.raises(OSError, match="disk I/O error"):
+        cache.set(["pdf:a"], '{"name": "A"}')
+    monkeypatch.undo()
+
+    assert cache.get("pdf:a") is None
+    cache.set(["pdf:b"], '{"name": "B"}')
+    assert cache.get("pdf:b") == '{"name": "B"}'
+
+
+def test_least_recently_used_entries_are_evicted(cache: ParseCache) -> None:
+    payload = "x" * 400
+    cache.set(["pdf:old"], payload)
+    cache.set(["pdf:new"], payload)
+    cache.get("pdf:old")
+    cache.set(["pdf:newest"], payload)
+
+    assert cache.get("pdf:new") is None
+    assert cache.get("pdf:old") == payload
+    assert cache.stats()["evictions"] == 1
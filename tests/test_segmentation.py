@@ -0,0 +1,19 @@
+import pytest
+
+from resume_parser.src.segmentation import _heading_section, _Line
+
+
+@pytest.mark.parametrize(
+    ("text", "section"),
+    [
+        ("Skills", "skills"),
+        ("SKILLS & TOOLS", "skills"),
+        ("Опыт работы:", "experience"),
+        ("Educational projects", None),
+        ("Skillsoft", None),
+        ("Стекольный завод", None),
+    ],
+)
+def test_heading_requires_whole_keyword(text: str, section: str | None) -> None:
+    line = _Line(text=text, size=14.0, bold=True, page=0)
+    assert _heading_section(line, body_size=10.0) == section
@@ -0,0 +1,46 @@
+import pytest
+
+from agent.config.config import settings
+from agent.src.result_encoder import ResultEncoding, encode_result
+from agent.src.sql_executor import QueryResult, _read_capped
+
+
+class FakeCursor:
+    def __init__(self, rows: int) -> None:
+        self.remaining = rows
+        self.fetched = 0
+
+    def fetchmany(self, size: int) -> list[tuple]:
+        batch = [(self.fetched + i,) for i in range(min(size, self.remaining))]
+        self.remaining -= len(batch)
+        self.fetched += len(batch)
+        return batch
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "sql_row_limit", 10)
+    monkeypatch.setattr(settings, "sql_fetch_batch_size", 4)
+
+
+def test_truncated_read_stops_one_row_past_the_limit() -> None:
+    cursor = FakeCursor(rows=1_000)
+    result = QueryResult(columns=["id"])
+
+    _read_capped(cursor, result)
+
+    assert result.truncated
+    assert len(result.rows) == 10
+    assert cursor.fetched == 11
+    assert encode_result(result, ResultEncoding.json).startswith("rows: 10 (truncated, more than 10 rows)\n")
+
+
+def test_result_at_the_limit_is_not_truncated() -> None:
+    cursor = FakeCursor(rows=10)
+    result = QueryResult(columns=["id"])
+
+    _read_capped(cursor, result)
+
+    assert not result.truncated
+    assert len(result.rows) == 10
+    assert encode_result(result, ResultEncoding.json).startswith("rows: 10\n")